@@ -0,0 +1,28 @@
+"""
+ASV benchmarks for solarposition.py
+"""
+
+import pandas as pd
+
+from pvlib.location import Location
+from pvlib import solarposition
+
+
+class Ephemeris(object):
+    """Scaling of solarposition.ephemeris with the number of years of
+    minute data."""
+
+    params = [1, 4]
+    param_names = ['nyears']
+
+    def setup(self, nyears):
+        self.location = Location(32.2, -111, 'US/Arizona', 700)
+        self.times = pd.date_range(start='2014-01-01',
+                                   periods=nyears * 525600, freq='1min',
+                                   tz=self.location.tz)
+
+    def time_ephemeris(self, nyears):
+        solarposition.ephemeris(self.times, self.location)
+
+    def peakmem_ephemeris(self, nyears):
+        solarposition.ephemeris(self.times, self.location)
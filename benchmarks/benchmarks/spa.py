@@ -0,0 +1,48 @@
+"""
+ASV benchmarks for spa.py
+"""
+
+import numpy as np
+
+from pvlib import spa
+
+
+class PeriodicTerms(object):
+    """Compare the row by row loops over the SPA periodic term tables with
+    the batched matrix evaluation used by the numpy backend."""
+
+    params = [1440, 525600]
+    param_names = ['ntimes']
+
+    def setup(self, ntimes):
+        unixtime = 1.0e9 + 60.0 * np.arange(ntimes)
+        jd = spa.julian_day(unixtime)
+        jde = spa.julian_ephemeris_day(jd, 67.0)
+        self.jce = spa.julian_ephemeris_century(jde)
+        self.jme = spa.julian_ephemeris_millennium(self.jce)
+        self.x = [spa.mean_elongation(self.jce),
+                  spa.mean_anomaly_sun(self.jce),
+                  spa.mean_anomaly_moon(self.jce),
+                  spa.moon_argument_latitude(self.jce),
+                  spa.moon_ascending_longitude(self.jce)]
+
+    def time_heliocentric_loop(self, ntimes):
+        spa.heliocentric_longitude(self.jme)
+        spa.heliocentric_latitude(self.jme)
+        spa.heliocentric_radius_vector(self.jme)
+
+    def time_heliocentric_batched(self, ntimes):
+        spa.heliocentric_longitude_batched(self.jme)
+        spa.heliocentric_latitude_batched(self.jme)
+        spa.heliocentric_radius_vector_batched(self.jme)
+
+    def time_nutation_loop(self, ntimes):
+        spa.longitude_nutation(self.jce, *self.x)
+        spa.obliquity_nutation(self.jce, *self.x)
+
+    def time_nutation_batched(self, ntimes):
+        spa.longitude_nutation_batched(self.jce, *self.x)
+        spa.obliquity_nutation_batched(self.jce, *self.x)
+
+    def peakmem_heliocentric_batched(self, ntimes):
+        spa.heliocentric_longitude_batched(self.jme)
@@ -0,0 +1,42 @@
+"""
+Write a JSON report of the speed and accuracy of the solar position
+methods, see pvlib._benchmark.benchmark_methods.
+
+Example::
+
+    python solarposition_report.py --max-size 1000000 --threads 1 4 8 \
+        --output report.json
+"""
+
+import argparse
+import logging
+
+from pvlib import _benchmark
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--max-size', type=int, default=10**7,
+                        help='largest number of times, the sizes are the '
+                        'powers of 10 up to it')
+    parser.add_argument('--methods', nargs='+',
+                        default=list(_benchmark.BENCHMARK_METHODS))
+    parser.add_argument('--threads', nargs='+', type=int, default=[1, 4])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=10.)
+    parser.add_argument('--output', default='solarposition_report.json')
+    args = parser.parse_args()
+
+    logging.basicConfig()
+    logging.getLogger('pvlib').setLevel(logging.INFO)
+
+    sizes = [size for size in _benchmark.BENCHMARK_SIZES
+             if size <= args.max_size]
+    result = _benchmark.benchmark_methods(
+        sizes, args.methods, args.threads, repeat=args.repeat,
+        max_seconds=args.max_seconds, path=args.output)
+    print(result.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
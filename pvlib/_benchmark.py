@@ -0,0 +1,155 @@
+"""
+Measure the speed and the accuracy of the solar position methods of
+pvlib.solarposition.get_solarposition. Used by
+pvlib.solarposition.calibrate_auto_method and
+benchmarks/solarposition_report.py.
+"""
+
+from __future__ import division
+import json
+import logging
+pvl_logger = logging.getLogger('pvlib')
+
+import numpy as np
+import pandas as pd
+
+from pvlib import solarposition
+
+
+# methods compared by benchmark_methods and the default sizes of the inputs
+BENCHMARK_METHODS = ('nrel_numpy', 'nrel_numba', 'nrel_c', 'pyephem',
+                     'ephemeris')
+BENCHMARK_SIZES = tuple(10**k for k in range(8))
+
+
+def _method_available(method):
+    """Return None if method can be used, otherwise the reason why not"""
+    if method == 'nrel_numba':
+        if not solarposition._spa_python_import('numba').USE_NUMBA:
+            return 'numba >= 0.34 is not installed'
+    elif method == 'nrel_c':
+        try:
+            from pvlib.spa_c_files import spa_py
+        except ImportError:
+            return 'the SPA C code is not compiled'
+    elif method == 'pyephem':
+        try:
+            import ephem
+        except ImportError:
+            return 'pyephem is not installed'
+    return None
+
+
+def _angular_separation(elevation1, azimuth1, elevation2, azimuth2):
+    """Angle in degrees between two sun positions, with the haversine
+    formula so that small angles are accurate"""
+    e1 = np.radians(elevation1)
+    e2 = np.radians(elevation2)
+    hav = (np.sin((e2 - e1) / 2)**2 + np.cos(e1) * np.cos(e2) *
+           np.sin(np.radians(azimuth2 - azimuth1) / 2)**2)
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(hav, 0, 1))))
+
+
+def benchmark_methods(sizes=BENCHMARK_SIZES, methods=BENCHMARK_METHODS,
+                      numthreads=(1, 4), location=None, repeat=3,
+                      max_seconds=10., path=None):
+    """
+    Measure the speed and the accuracy of the solar position methods of
+    :func:`pvlib.solarposition.get_solarposition`.
+
+    Each method is called for minute times starting at 2014-01-01 for
+    each of the sizes, in increasing order, and with each of the
+    numthreads for the 'nrel_numba' and 'nrel_c' methods. The cache and
+    the store of get_solarposition are not used.
+
+    Parameters
+    ----------
+    sizes : sequence of int, optional
+        Numbers of times.
+    methods : sequence of str, optional
+        Methods of get_solarposition. Methods that can not be used,
+        e.g. because pyephem is not installed, are skipped.
+    numthreads : sequence of int, optional
+        Numbers of threads for the methods that use them.
+    location : pvlib.Location, optional
+        By default, Tucson, AZ.
+    repeat : int, optional
+        Number of calls for each size after the first call.
+    max_seconds : float, optional
+        The larger sizes of a method are skipped once a call takes
+        longer than this.
+    path : str, optional
+        If given, the report is written to this file as JSON with the
+        pvlib version, the number of cores and a list of the results.
+
+    Returns
+    -------
+    DataFrame with one row for each method, numthreads and size and the
+    columns:
+        first_call : seconds for the first call, which includes e.g.
+            the numba compilation for the first size,
+        time : fastest of the repeated calls in seconds,
+        throughput : times per second of the fastest call,
+        max_error : maximum angle in degrees between the sun position
+            and the position from 'nrel_numpy', using the elevation
+            without refraction and the azimuth.
+    """
+    from timeit import default_timer
+    import multiprocessing
+    from pvlib.location import Location
+    from pvlib.version import __version__
+
+    if location is None:
+        location = Location(32.2, -111, 'US/Arizona', 700)
+
+    records = []
+    references = {}
+    for method in methods:
+        reason = _method_available(method)
+        if reason is not None:
+            pvl_logger.info('Skipping %s: %s', method, reason)
+            continue
+        threads = numthreads if method in ('nrel_numba', 'nrel_c') else [1]
+        for nthreads in threads:
+            kwargs = {}
+            if method in ('nrel_numba', 'nrel_c'):
+                kwargs['numthreads'] = nthreads
+            for size in sorted(sizes):
+                time = pd.date_range(start='2014-01-01', periods=size,
+                                     freq='1min', tz=location.tz)
+                durations = []
+                for i in range(repeat + 1):
+                    start = default_timer()
+                    result = solarposition._calculate_solarposition(
+                        time, location, method, 101325, 12, None, **kwargs)
+                    durations.append(default_timer() - start)
+
+                if size not in references:
+                    reference = solarposition._calculate_solarposition(
+                        time, location, 'nrel_numpy', 101325, 12, None)
+                    references[size] = (reference['elevation'].values,
+                                        reference['azimuth'].values)
+                error = _angular_separation(
+                    references[size][0], references[size][1],
+                    result['elevation'].values, result['azimuth'].values)
+
+                best = min(durations[1:]) if repeat > 0 else durations[0]
+                records.append({'method': method, 'numthreads': nthreads,
+                                'size': size, 'first_call': durations[0],
+                                'time': best, 'throughput': size / best,
+                                'max_error': float(np.max(error))})
+                pvl_logger.info('%s with %s threads: %s times in %.3g s',
+                                method, nthreads, size, best)
+                if best > max_seconds:
+                    pvl_logger.info('Skipping larger sizes of %s', method)
+                    break
+
+    if path is not None:
+        with open(path, 'w') as f:
+            json.dump({'pvlib_version': __version__,
+                       'cores': multiprocessing.cpu_count(),
+                       'results': records}, f, indent=1, sort_keys=True)
+
+    return pd.DataFrame(records, columns=['method', 'numthreads', 'size',
+                                          'first_call', 'time', 'throughput',
+                                          'max_error'])
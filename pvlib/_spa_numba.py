@@ -0,0 +1,20 @@
+"""
+A copy of pvlib.spa with the functions compiled with numba, so that it can be
+used in the same process as pvlib.spa imported in the other mode. See
+pvlib.solarposition._spa_python_import.
+
+The source of pvlib.spa is executed here with _PVLIB_USE_NUMBA set, and
+compiled with the file name of spa.py. numba's on-disk cache is located by
+that file name, so this module and pvlib.spa share the cache entries in
+pvlib/__pycache__. This is a module rather than a copy made at runtime so
+that numba can import it by name when it loads an entry that it wrote.
+See the comment at the top of pvlib/spa.py.
+"""
+
+import os
+
+_PVLIB_USE_NUMBA = True
+
+_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spa.py')
+with open(_path) as _f:
+    exec(compile(_f.read(), _path, 'exec'))
@@ -0,0 +1,17 @@
+"""
+A copy of pvlib.spa with the functions evaluated with numpy, so that it can be
+used in the same process as pvlib.spa imported in the other mode. See
+pvlib.solarposition._spa_python_import.
+
+The source of pvlib.spa is executed here with _PVLIB_USE_NUMBA set, as in
+pvlib._spa_numba. Nothing is compiled in this copy, so it does not use
+numba's on-disk cache. See the comment at the top of pvlib/spa.py.
+"""
+
+import os
+
+_PVLIB_USE_NUMBA = False
+
+_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spa.py')
+with open(_path) as _f:
+    exec(compile(_f.read(), _path, 'exec'))
@@ -51,7 +51,9 @@ def extraradiation(datetime_or_doy, solar_constant=1366.1, method='spencer'):
 
     method : string
         The method by which the ET radiation should be calculated.
-        Options include ``'pyephem', 'spencer', 'asce'``.
+        Options include ``'pyephem', 'spencer', 'asce', 'nrel'``.
+        ``'nrel'`` uses the earth-sun distance of the NREL SPA
+        algorithm, which is vectorized and does not need pyephem.
 
     Returns
     -------
@@ -61,7 +63,7 @@ def extraradiation(datetime_or_doy, solar_constant=1366.1, method='spencer'):
         on a surface which is normal to the sun. Ea is of the same size as the
         input doy.
 
-        'pyephem' always returns a series.
+        'pyephem' and 'nrel' always return a series.
 
     Notes
     -----
@@ -116,6 +118,10 @@ def extraradiation(datetime_or_doy, solar_constant=1366.1, method='spencer'):
         pvl_logger.debug('Calculating ET rad using pyephem method')
         times = input_to_datetimeindex(datetime_or_doy)
         RoverR0sqrd = solarposition.pyephem_earthsun_distance(times) ** (-2)
+    elif method == 'nrel':
+        pvl_logger.debug('Calculating ET rad using NREL SPA method')
+        times = input_to_datetimeindex(datetime_or_doy)
+        RoverR0sqrd = solarposition.nrel_earthsun_distance(times) ** (-2)
 
     Ea = solar_constant * RoverR0sqrd
 
@@ -151,7 +157,9 @@ def _array_to_datetimeindex(doy_array):
     -------
     pd.DatetimeIndex
     """
-    return pd.DatetimeIndex(list(map(_doy_to_timestamp, doy_array)))
+    doy_array = np.asarray(doy_array, dtype=np.float64)
+    return pd.DatetimeIndex(pd.Timestamp('2013-12-31') +
+                            pd.to_timedelta(doy_array, unit='D'))
 
 
 def _doy_to_timestamp(doy, epoch='2013-12-31'):
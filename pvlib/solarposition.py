@@ -9,16 +9,16 @@ Calculate the solar position using a variety of methods/packages.
 
 from __future__ import division
 import os
+import sys
+import time as _time
+import json
+import hashlib
+import importlib
+import threading
 import logging
 pvl_logger = logging.getLogger('pvlib')
 import datetime as dt
-try:
-    from importlib import reload
-except ImportError:
-    try:
-        from imp import reload
-    except ImportError:
-        pass
+from collections import OrderedDict
 
 
 import numpy as np
@@ -29,15 +29,26 @@ from pvlib.tools import localize_to_utc, datetime_to_djd, djd_to_datetime
 
 
 def get_solarposition(time, location, method='nrel_numpy', pressure=101325,
-                      temperature=12, **kwargs):
+                      temperature=12, outputs=None, **kwargs):
     """
     A convenience wrapper for the solar position calculators.
 
     Parameters
     ----------
-    time : pandas.DatetimeIndex
-    location : pvlib.Location object
+    time : pandas.DatetimeIndex or numpy array
+        The 'nrel_numpy' and 'nrel_numba' methods also accept a numpy
+        array of UTC epoch seconds and then return a dict of numpy
+        arrays, see :func:`spa_python`. Other arrays, e.g. of
+        datetime64, are converted to a DatetimeIndex.
+    location : pvlib.Location object or list of Location objects
+        If a list is given, a list of DataFrames is returned in the
+        same order. The 'nrel_numpy' and 'nrel_numba' methods share
+        the location independent part of the calculation between
+        the sites, see :func:`spa_python_multisite`.
     method : string
+        'auto' picks the fastest of the NREL SPA methods that are
+        available for the number of times: :func:`select_method`
+
         'pyephem' uses the PyEphem package: :func:`pyephem`
 
         'nrel_c' uses the NREL SPA C code [3]: :func:`spa_c`
@@ -53,6 +64,11 @@ def get_solarposition(time, location, method='nrel_numpy', pressure=101325,
         Pascals.
     temperature : float
         Degrees C.
+    outputs : list of str, optional
+        Names of the columns to return, e.g. ['apparent_zenith',
+        'azimuth']. The 'nrel_numpy' method skips the calculation of the
+        other columns, the other methods calculate and drop them. An
+        empty list raises a ValueError.
 
     Other keywords are passed to the underlying solar position function.
 
@@ -65,20 +81,104 @@ def get_solarposition(time, location, method='nrel_numpy', pressure=101325,
     solar radiation applications. Solar Energy, vol. 81, no. 6, p. 838, 2007.
 
     [3] NREL SPA code: http://rredc.nrel.gov/solar/codesandalgorithms/spa/
+
+    Notes
+    -----
+    If the cache was turned on with :func:`enable_cache`, the results
+    are kept in memory and repeated calls with the same times, location
+    and arguments, e.g. from :func:`pvlib.clearsky.ineichen`, return a
+    copy of the cached result.
+
+    If a store was opened with :func:`enable_store`, the results of
+    the NREL methods for times within one year are read from, or first
+    written to, a memory mapped file for the whole year, see
+    :func:`enable_store`. These results are read only views of the
+    file unless the cache is also on, use ``result.copy()`` to modify
+    them.
     """
 
-    method = method.lower()
+    if outputs is not None and len(outputs) == 0:
+        raise ValueError('No solar position outputs selected')
+
     if isinstance(time, dt.datetime):
         time = pd.DatetimeIndex([time, ])
+    elif isinstance(time, np.ndarray) and time.dtype.kind == 'M':
+        time = pd.DatetimeIndex(time)
+
+    if method.lower() == 'auto':
+        size = len(time)
+        if isinstance(location, (list, tuple)):
+            size *= len(location)
+        nlocations = (len(location) if isinstance(location, (list, tuple))
+                      else 1)
+        method = select_method(
+            size, numpy_times=_epoch_array(time) is not None,
+            kwargs=kwargs, nlocations=nlocations)
+
+    if _CACHE is None:
+        return _get_solarposition(time, location, method, pressure,
+                                  temperature, outputs, **kwargs)
 
-    if method == 'nrel_c':
+    try:
+        key = _cache_key(time, location, method, pressure, temperature,
+                         outputs, kwargs)
+    except TypeError:
+        pvl_logger.debug('Arguments can not be cached, calculating solar '
+                         'position')
+        return _get_solarposition(time, location, method, pressure,
+                                  temperature, outputs, **kwargs)
+
+    result = _CACHE.get(key)
+    if result is None:
+        result = _get_solarposition(time, location, method, pressure,
+                                    temperature, outputs, **kwargs)
+        _CACHE.put(key, result)
+    return _copy_result(result)
+
+
+def _get_solarposition(time, location, method, pressure, temperature,
+                       outputs, **kwargs):
+    """get_solarposition without the cache"""
+    store = _STORE
+    if store is not None:
+        result = store.get(time, location, method, pressure, temperature,
+                           outputs, kwargs)
+        if result is not None:
+            return result
+    return _calculate_solarposition(time, location, method, pressure,
+                                    temperature, outputs, **kwargs)
+
+
+def _calculate_solarposition(time, location, method, pressure, temperature,
+                             outputs, **kwargs):
+    """get_solarposition without the cache and the store"""
+    method = method.lower()
+    if isinstance(time, dt.datetime):
+        time = pd.DatetimeIndex([time, ])
+    elif isinstance(time, np.ndarray) and time.dtype.kind == 'M':
+        time = pd.DatetimeIndex(time)
+    elif (_epoch_array(time) is not None and
+            method not in ('nrel_numpy', 'nrel_numba')):
+        raise ValueError('numpy epoch array times are only supported by '
+                         'the nrel_numpy and nrel_numba methods')
+
+    if isinstance(location, (list, tuple)):
+        if method in ('nrel_numpy', 'nrel_numba'):
+            results = spa_python_multisite(time, location, pressure,
+                                           temperature, how=method[5:],
+                                           **kwargs)
+            if outputs is None:
+                return results
+            return [_select_outputs(result, outputs) for result in results]
+        return [_calculate_solarposition(time, loc, method, pressure,
+                                         temperature, outputs, **kwargs)
+                for loc in location]
+
+    if method in ('nrel_numpy', 'nrel_numba'):
+        return spa_python(time, location, pressure, temperature,
+                          how=method[5:], outputs=outputs, **kwargs)
+    elif method == 'nrel_c':
         ephem_df = spa_c(time, location, pressure, temperature, **kwargs)
-    elif method == 'nrel_numba':
-        ephem_df = spa_python(time, location, pressure, temperature,
-                              how='numba', **kwargs)
-    elif method == 'nrel_numpy':
-        ephem_df = spa_python(time, location, pressure, temperature,
-                              how='numpy', **kwargs)
     elif method == 'pyephem':
         ephem_df = pyephem(time, location, pressure, temperature, **kwargs)
     elif method == 'ephemeris':
@@ -86,11 +186,530 @@ def get_solarposition(time, location, method='nrel_numpy', pressure=101325,
     else:
         raise ValueError('Invalid solar position method')
 
+    if outputs is not None:
+        ephem_df = _select_outputs(ephem_df, outputs)
+
     return ephem_df
 
 
+def _select_outputs(result, outputs):
+    """Select the outputs from a DataFrame or dict of arrays"""
+    if isinstance(result, dict):
+        return dict((name, result[name]) for name in outputs)
+    return result[list(outputs)]
+
+
+# default size limit of the solar position cache, see enable_cache
+CACHE_MAX_BYTES = 256*2**20
+
+_CACHE = None
+
+
+class _ResultCache(object):
+    """Thread safe least recently used cache of solar position results
+    with a limit on the bytes held"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                result, nbytes = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries[key] = (result, nbytes)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        nbytes = _result_nbytes(result)
+        if nbytes > self.max_bytes:
+            pvl_logger.debug('Solar position result of %s bytes is larger '
+                             'than the cache', nbytes)
+            return
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                self.nbytes -= self._entries.popitem(last=False)[1][1]
+
+    def info(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'bytes': self.nbytes, 'entries': len(self._entries),
+                    'max_bytes': self.max_bytes}
+
+
+def enable_cache(max_bytes=CACHE_MAX_BYTES):
+    """
+    Keep the results of :func:`get_solarposition` in memory.
+
+    The results are keyed by the location coordinates, altitude and
+    timezone, a fingerprint of the times, the method, pressure,
+    temperature, outputs and other keywords. When the results hold more
+    than max_bytes, the least recently used are dropped. Calling
+    enable_cache again empties the cache and resets the statistics.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Maximum size in bytes of the cached results.
+
+    See also
+    --------
+    disable_cache, cache_info
+    """
+    global _CACHE
+    _CACHE = _ResultCache(max_bytes)
+
+
+def disable_cache():
+    """Stop caching the results of :func:`get_solarposition` and release
+    the cached results."""
+    global _CACHE
+    _CACHE = None
+
+
+def cache_info():
+    """
+    Statistics of the solar position cache.
+
+    Returns
+    -------
+    dict with the number of 'hits' and 'misses', the 'bytes' and
+    'entries' held and 'max_bytes', or None if the cache is not enabled.
+    """
+    cache = _CACHE
+    if cache is None:
+        return None
+    return cache.info()
+
+
+def _fingerprint(value):
+    """Return a hashable fingerprint of a scalar, array or time index.
+    Raises TypeError if value is not supported."""
+    if isinstance(value, pd.Series):
+        return ('Series', str(value.dtype), _fingerprint(value.values),
+                _fingerprint(value.index))
+    if isinstance(value, pd.Index):
+        # the dtype of a DatetimeIndex includes the timezone
+        return (type(value).__name__, str(value.dtype),
+                _fingerprint(value.values))
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError('object arrays can not be cached')
+        # hash the bytes through a uint8 view, ndarray.tobytes needs
+        # numpy 1.9
+        data = np.ascontiguousarray(value).reshape(-1).view(np.uint8)
+        return (str(value.dtype), value.shape,
+                hashlib.sha1(data).hexdigest())
+    if isinstance(value, (list, tuple)):
+        return tuple(_fingerprint(item) for item in value)
+    hash(value)
+    return value
+
+
+def _cache_key(time, location, method, pressure, temperature, outputs,
+               kwargs):
+    """Key of the solar position cache"""
+    if isinstance(location, (list, tuple)):
+        locations = tuple(_location_key(loc) for loc in location)
+    else:
+        locations = _location_key(location)
+    return (_fingerprint(time), locations, method.lower(),
+            _fingerprint(pressure), _fingerprint(temperature),
+            None if outputs is None else tuple(outputs),
+            tuple(sorted((name, _fingerprint(value))
+                         for name, value in kwargs.items())))
+
+
+def _location_key(location):
+    return (_fingerprint(location.latitude),
+            _fingerprint(location.longitude),
+            _fingerprint(location.altitude), str(location.tz))
+
+
+def _result_nbytes(result):
+    """Size in bytes of a DataFrame, dict of arrays or list of them"""
+    if isinstance(result, list):
+        return sum(_result_nbytes(item) for item in result)
+    if isinstance(result, dict):
+        return sum(np.asarray(value).nbytes for value in result.values())
+    return int(result.memory_usage(index=True).sum())
+
+
+def _copy_result(result):
+    """Copy a cached result so that the caller can modify it"""
+    if isinstance(result, list):
+        return [_copy_result(item) for item in result]
+    if isinstance(result, dict):
+        return dict((name, np.array(value))
+                    for name, value in result.items())
+    return result.copy()
+
+
+# default spacing in seconds of the times in the files of the store, see
+# enable_store
+STORE_FREQ = 60
+
+# default methods of get_solarposition that are read from the store. The
+# other methods are too slow to calculate a whole year at STORE_FREQ.
+STORE_METHODS = ('nrel_numpy', 'nrel_numba', 'nrel_c')
+
+_STORE = None
+
+
+class _SolarPositionStore(object):
+    """Directory of memory mapped solar position files, one for each site,
+    year and set of arguments"""
+
+    def __init__(self, path, freq, methods):
+        self.path = path
+        self.freq = int(freq)
+        self.methods = tuple(method.lower() for method in methods)
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def _describe(self, location, method, pressure, temperature, kwargs,
+                  year):
+        """Return the description of the file for the arguments, or None if
+        the arguments can not be stored"""
+        if isinstance(location, (list, tuple)):
+            return None
+        values = (location.latitude, location.longitude, location.altitude,
+                  pressure, temperature)
+        if any(np.ndim(value) != 0 for value in values):
+            return None
+        try:
+            extra = repr(tuple(sorted((name, _fingerprint(value))
+                                      for name, value in kwargs.items())))
+        except TypeError:
+            return None
+        return {'latitude': float(location.latitude),
+                'longitude': float(location.longitude),
+                'altitude': float(location.altitude),
+                'pressure': float(pressure),
+                'temperature': float(temperature),
+                'method': method.lower(), 'kwargs': extra,
+                'year': int(year), 'freq': self.freq}
+
+    def get(self, time, location, method, pressure, temperature, outputs,
+            kwargs):
+        """Return the solar position from the store, writing the file for
+        the year first if needed, or None if the times or arguments can
+        not be stored"""
+        if not isinstance(time, pd.DatetimeIndex) or len(time) == 0:
+            return None
+        if method.lower() not in self.methods:
+            return None
+        time_utc = localize_to_utc(time, location)
+        year = int(time_utc[0].year)
+        step = self.freq * 10**9
+        start = pd.Timestamp(dt.datetime(year, 1, 1)).value
+        end = pd.Timestamp(dt.datetime(year + 1, 1, 1)).value
+        offsets = time_utc.asi8 - start
+        if ((offsets < 0).any() or (offsets >= end - start).any() or
+                (offsets % step).any()):
+            return None
+        description = self._describe(location, method, pressure,
+                                     temperature, kwargs, year)
+        if description is None:
+            return None
+
+        name = hashlib.sha1(json.dumps(
+            description, sort_keys=True).encode('utf-8')).hexdigest()[:20]
+        filename = os.path.join(self.path, name + '.npy')
+        if not os.path.exists(filename):
+            self._write(filename, description, location, method, pressure,
+                        temperature, kwargs)
+        with open(os.path.join(self.path, name + '.json')) as f:
+            columns = json.load(f)['columns']
+
+        data = np.load(filename, mmap_mode='r')
+        rows = offsets // step
+        stride = rows[1] - rows[0] if len(rows) > 1 else 1
+        if stride > 0 and (np.diff(rows) == stride).all():
+            pvl_logger.debug('Reading a view of %s', filename)
+            data = data[rows[0]:rows[-1] + 1:stride]
+        else:
+            data = data[rows]
+        result = pd.DataFrame(data, index=time, columns=columns, copy=False)
+        if outputs is not None:
+            result = _select_outputs(result, outputs)
+        return result
+
+    def _write(self, filename, description, location, method, pressure,
+               temperature, kwargs):
+        """Calculate the solar position for the year and write the file
+        and its description"""
+        year = description['year']
+        start = pd.Timestamp(dt.datetime(year, 1, 1)).tz_localize('UTC')
+        end = pd.Timestamp(dt.datetime(year + 1, 1, 1)).tz_localize('UTC')
+        periods = int((end - start).total_seconds()) // self.freq
+        time = pd.date_range(start=start, periods=periods,
+                             freq=pd.Timedelta(seconds=self.freq))
+        pvl_logger.debug('Writing %s times to %s', periods, filename)
+        result = _calculate_solarposition(time, location, method, pressure,
+                                          temperature, None, **kwargs)
+        description = dict(description, columns=list(result.columns))
+
+        # write to temporary files and rename them so that other processes
+        # never see partial files
+        tmp = '%s.%s.%s' % (filename, os.getpid(),
+                            threading.current_thread().ident)
+        with open(tmp + '.json', 'w') as f:
+            json.dump(description, f, sort_keys=True)
+        _replace(tmp + '.json', filename[:-4] + '.json')
+        with open(tmp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(result.values, dtype=np.float64))
+        _replace(tmp, filename)
+
+
+def _replace(src, dst):
+    """Rename src to dst, replacing dst if it exists"""
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        os.rename(src, dst)
+
+
+def enable_store(path, freq=STORE_FREQ, methods=STORE_METHODS):
+    """
+    Read the results of :func:`get_solarposition` from a directory of
+    memory mapped files, and write the files that are missing.
+
+    The times of each request must be within one UTC year and multiples
+    of freq seconds. The solar position for the whole year at freq is
+    then calculated once and saved as a ``.npy`` file, with a ``.json``
+    file that describes the site, year and arguments. The file name is
+    a hash of the description. Later requests, including from other
+    processes, return DataFrames with read only views of the memory
+    mapped file if the times are evenly spaced, without reading the
+    rest of the file into memory. Other requests are calculated as
+    usual.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the store, created if it does not exist.
+    freq : int, optional
+        Seconds between the times in the files.
+    methods : sequence of str, optional
+        Methods of get_solarposition that use the store, by default the
+        NREL SPA methods. Other methods are calculated as usual.
+
+    See also
+    --------
+    disable_store, enable_cache
+    """
+    global _STORE
+    _STORE = _SolarPositionStore(path, freq, methods)
+
+
+def disable_store():
+    """Stop reading and writing the solar position store."""
+    global _STORE
+    _STORE = None
+
+
+def iter_solarposition(start, end, freq, location, chunk=86400,
+                       method='nrel_numpy', pressure=101325, temperature=12,
+                       outputs=None, **kwargs):
+    """
+    Calculate the solar position for a range of times in chunks.
+
+    The times from start to end at the given frequency are generated
+    and calculated chunk by chunk, so the full index is never created and
+    memory use does not depend on the length of the range.
+
+    Parameters
+    ----------
+    start : datetime-like
+        First time of the range. If start and end are not localized,
+        they are interpreted in the timezone of the location.
+    end : datetime-like
+        Last time of the range, inclusive.
+    freq : str or pandas DateOffset
+        Frequency of the times, e.g. '1s' or '15min'.
+    location : pvlib.Location object
+    chunk : int, optional
+        Number of times in each chunk. The last chunk may be shorter.
+    method, pressure, temperature, outputs
+        See :func:`get_solarposition`.
+
+    Other keywords are passed to :func:`get_solarposition`.
+
+    Yields
+    ------
+    DataFrame
+        The solar position for each chunk of times, in order, as returned
+        by :func:`get_solarposition`.
+
+    See also
+    --------
+    get_solarposition
+    """
+    if chunk < 1:
+        raise ValueError('chunk must be at least 1')
+
+    offset = pd.tseries.frequencies.to_offset(freq)
+    end = pd.Timestamp(end)
+    current = pd.Timestamp(start)
+    pvl_logger.debug('Calculating solar position from %s to %s in chunks of '
+                     '%s', current, end, chunk)
+
+    while current <= end:
+        time = pd.date_range(start=current, periods=chunk, freq=offset)
+        if time[-1] > end:
+            time = time[time <= end]
+        yield get_solarposition(time, location, method, pressure,
+                                temperature, outputs, **kwargs)
+        current = time[-1] + offset
+
+
+# mean rate of the apparent sidereal time in degrees per second
+SIDEREAL_RATE = 360.98564736629 / 86400
+
+
+class RealTimeSolarPosition(object):
+    """
+    Solar position at one location for single times close to each other,
+    e.g. the current time every second for a tracker controller.
+
+    The location independent terms of the NREL SPA algorithm, which
+    include the heliocentric series and the nutation, are calculated at
+    the start and the end of each refresh interval and interpolated
+    linearly in between. The terms are calculated again when a time
+    falls in another interval. The topocentric terms, including the
+    atmospheric refraction, are calculated exactly for every time.
+
+    The interpolation error is less than 1e-5 degrees for refresh
+    intervals up to one hour, which is below the 3e-4 degree
+    uncertainty of the SPA algorithm.
+
+    With how='numba', the topocentric terms are compiled and a call
+    takes about 2 microseconds once the terms of the interval are
+    known. With how='numpy', the same terms go through numpy for a
+    single time and a call takes about 60 microseconds. By default,
+    numba is used if it is installed.
+
+    Parameters
+    ----------
+    location : pvlib.Location object
+    pressure : float, optional
+        avg. yearly air pressure in Pascals.
+    temperature : float, optional
+        avg. yearly air temperature in degrees C.
+    delta_t : float, optional
+        Difference between terrestrial time and UT1.
+    atmos_refract : float, optional
+        The approximate atmospheric refraction (in degrees)
+        at sunrise and sunset.
+    refresh : float, optional
+        Length in seconds of the intervals. The intervals start at
+        multiples of refresh since 1970-01-01 UTC.
+    how : None or str, optional
+        Options are 'numpy' or 'numba', see :func:`spa_python`. By
+        default 'numba' if numba >= 0.34 is installed, otherwise
+        'numpy'.
+
+    See also
+    --------
+    spa_python
+    """
+
+    def __init__(self, location, pressure=101325, temperature=12,
+                 delta_t=67.0, atmos_refract=0.5667, refresh=3600.,
+                 how=None):
+        if how is None:
+            how = 'numba' if _auto_method_status('nrel_numba')[0] else 'numpy'
+        self.location = location
+        self.refresh = float(refresh)
+        self.how = how
+        self._spa = _spa_python_import(how)
+        self._args = (float(location.latitude), float(location.longitude),
+                      float(location.altitude), pressure / 100.,
+                      float(temperature), float(atmos_refract))
+        self.delta_t = delta_t
+        self._anchor = (np.inf, None, None)
+
+    def _update(self, start):
+        """Calculate the terms at the start and end of the interval and
+        their rates of change"""
+        pvl_logger.debug('Refreshing the geocentric terms at %s', start)
+        geo = self._spa.geocentric_position_array(
+            np.array([start, start + self.refresh]), self.delta_t)
+        diff = geo[:, 1] - geo[:, 0]
+        # the sidereal time advances by more than 360 degrees a day and
+        # the right ascension wraps at 360 degrees
+        advance = SIDEREAL_RATE * self.refresh
+        diff[0] = (diff[0] - advance + 180) % 360 - 180 + advance
+        diff[1] = (diff[1] + 180) % 360 - 180
+        anchor = (start, tuple(geo[:, 0].tolist()),
+                  tuple((diff / self.refresh).tolist()))
+        self._anchor = anchor
+        return anchor
+
+    def get_position(self, unixtime=None):
+        """
+        Calculate the solar position at one time.
+
+        Parameters
+        ----------
+        unixtime : None, float, datetime or pandas.Timestamp, optional
+            Seconds since 1970-01-01 00:00:00 UTC, or a time, which is
+            assumed to be in the time zone of the location if it is not
+            localized. By default, the current time.
+
+        Returns
+        -------
+        dict with the apparent_zenith, zenith, apparent_elevation,
+        elevation, azimuth and equation_of_time.
+        """
+        if unixtime is None:
+            unixtime = _time.time()
+        elif isinstance(unixtime, (dt.datetime, np.datetime64)):
+            timestamp = pd.Timestamp(unixtime)
+            if timestamp.tz is None:
+                timestamp = timestamp.tz_localize(self.location.tz)
+            unixtime = timestamp.value / 10**9
+        else:
+            try:
+                unixtime = float(unixtime)
+            except (TypeError, ValueError):
+                raise TypeError('unixtime must be a number of seconds or a '
+                                'time, not %r' % (unixtime, ))
+        start, geo, rate = self._anchor
+        elapsed = unixtime - start
+        if not 0 <= elapsed < self.refresh:
+            start, geo, rate = self._update(
+                (unixtime // self.refresh) * self.refresh)
+            elapsed = unixtime - start
+
+        v = (geo[0] + rate[0] * elapsed) % 360
+        alpha = (geo[1] + rate[1] * elapsed) % 360
+        delta = geo[2] + rate[2] * elapsed
+        xi = geo[3] + rate[3] * elapsed
+        lat, lon, elev, pressure, temp, atmos_refract = self._args
+        theta, theta0, e, e0, phi = self._spa.topocentric_position(
+            v, alpha, delta, xi, lat, lon, elev, pressure, temp,
+            atmos_refract)
+        return {'apparent_zenith': theta, 'zenith': theta0,
+                'apparent_elevation': e, 'elevation': e0, 'azimuth': phi,
+                'equation_of_time': geo[4] + rate[4] * elapsed}
+
+
 def spa_c(time, location, pressure=101325, temperature=12, delta_t=67.0,
-          raw_spa_output=False):
+          raw_spa_output=False, numthreads=1):
     """
     Calculate the solar position using the C implementation of the NREL
     SPA code
@@ -110,9 +729,15 @@ def spa_c(time, location, pressure=101325, temperature=12, delta_t=67.0,
         Temperature in C
     delta_t : float
         Difference between terrestrial time and UT1.
-        USNO has previous values and predictions.
+        USNO has previous values and predictions. None uses 67.0, as in
+        :func:`spa_python`.
     raw_spa_output : bool
-        If true, returns the raw SPA output.
+        If true, returns the raw SPA output, all of the fields of
+        spa_data. The raw output is calculated one time at a time.
+    numthreads : int
+        Number of threads used by the compiled loop over the times.
+        Only used if the SPA code was compiled with OpenMP and
+        raw_spa_output is False.
 
     Returns
     -------
@@ -140,32 +765,50 @@ def spa_c(time, location, pressure=101325, temperature=12, delta_t=67.0,
     # Edited by Tony Lorenzo (@alorenzo175), University of Arizona, 2015
 
     try:
-        from pvlib.spa_c_files.spa_py import spa_calc
+        from pvlib.spa_c_files import spa_py
     except ImportError:
         raise ImportError('Could not import built-in SPA calculator. ' +
                           'You may need to recompile the SPA code.')
 
     pvl_logger.debug('using built-in spa code to calculate solar position')
 
+    if delta_t is None:
+        delta_t = 67.0
+
     time_utc = localize_to_utc(time, location)
 
-    spa_out = []
-
-    for date in time_utc:
-        spa_out.append(spa_calc(year=date.year,
-                                month=date.month,
-                                day=date.day,
-                                hour=date.hour,
-                                minute=date.minute,
-                                second=date.second,
-                                timezone=0,  # tz corrections handled above
-                                latitude=location.latitude,
-                                longitude=location.longitude,
-                                elevation=location.altitude,
-                                pressure=pressure / 100,
-                                temperature=temperature,
-                                delta_t=delta_t
-                                ))
+    # spa_calc_array only returns the angles, so the raw output, which
+    # has every field of spa_data, uses spa_calc
+    if hasattr(spa_py, 'spa_calc_array') and not raw_spa_output:
+        unixtime = time_utc.astype(np.int64)/10**9
+        spa_out = spa_py.spa_calc_array(unixtime,
+                                        latitude=location.latitude,
+                                        longitude=location.longitude,
+                                        elevation=location.altitude,
+                                        pressure=pressure / 100,
+                                        temperature=temperature,
+                                        delta_t=delta_t,
+                                        numthreads=numthreads)
+    else:
+        if not raw_spa_output:
+            pvl_logger.debug('spa_calc_array not found, recompile the SPA '
+                             'code for the faster array interface')
+        spa_out = []
+        for date in time_utc:
+            spa_out.append(spa_py.spa_calc(year=date.year,
+                                           month=date.month,
+                                           day=date.day,
+                                           hour=date.hour,
+                                           minute=date.minute,
+                                           second=date.second,
+                                           timezone=0,  # tz handled above
+                                           latitude=location.latitude,
+                                           longitude=location.longitude,
+                                           elevation=location.altitude,
+                                           pressure=pressure / 100,
+                                           temperature=temperature,
+                                           delta_t=delta_t
+                                           ))
 
     spa_df = pd.DataFrame(spa_out, index=time_utc).tz_convert(location.tz)
 
@@ -181,38 +824,46 @@ def spa_c(time, location, pressure=101325, temperature=12, delta_t=67.0,
         return dfout
 
 
+def _epoch_array(time):
+    """Return time as a float64 array of seconds since 1970-01-01 UTC if
+    it is a numpy array of numbers, otherwise None. datetime64 arrays
+    return None so that they are localized like a DatetimeIndex."""
+    if not isinstance(time, np.ndarray):
+        return None
+    if time.dtype.kind in 'iuf':
+        return time.astype(np.float64, copy=False).ravel()
+    return None
+
+
 def _spa_python_import(how):
-    """Compile spa.py appropriately"""
+    """Return a copy of the spa module compiled appropriately.
+
+    pvlib.spa is returned if it was already compiled for how. Otherwise
+    pvlib._spa_numba or pvlib._spa_numpy is imported, which run the source
+    of pvlib.spa with the compile mode fixed, so that both modes can be used
+    in one process without reloading pvlib.spa. The compiled numba functions
+    are cached on disk, so they are only compiled once.
+    """
 
     from pvlib import spa
 
-    # check to see if the spa module was compiled with numba
-    using_numba = spa.USE_NUMBA
-
-    if how == 'numpy' and using_numba:
-        # the spa module was compiled to numba code, so we need to
-        # reload the module without compiling
-        # the PVLIB_USE_NUMBA env variable is used to tell the module
-        # to not compile with numba
-        os.environ['PVLIB_USE_NUMBA'] = '0'
-        pvl_logger.debug('Reloading spa module without compiling')
-        spa = reload(spa)
-        del os.environ['PVLIB_USE_NUMBA']
-    elif how == 'numba' and not using_numba:
-        # The spa module was not compiled to numba code, so set
-        # PVLIB_USE_NUMBA so it does compile to numba on reload.
-        os.environ['PVLIB_USE_NUMBA'] = '1'
-        pvl_logger.debug('Reloading spa module, compiling with numba')
-        spa = reload(spa)
-        del os.environ['PVLIB_USE_NUMBA']
-    elif how != 'numba' and how != 'numpy':
+    if how != 'numba' and how != 'numpy':
         raise ValueError("how must be either 'numba' or 'numpy'")
 
-    return spa
+    if spa.USE_NUMBA == (how == 'numba'):
+        return spa
+
+    name = 'pvlib._spa_' + how
+    if name not in sys.modules:
+        pvl_logger.debug('Loading a copy of the spa module with how=%s', how)
+    # the import lock makes this safe to call from several threads
+    return importlib.import_module(name)
 
 
 def spa_python(time, location, pressure=101325, temperature=12, delta_t=None,
-               atmos_refract=None, how='numpy', numthreads=4):
+               atmos_refract=None, how='numpy', numthreads=4,
+               chebyshev_ephemeris=None, outputs=None, interpolate=None,
+               tolerance=None):
     """
     Calculate the solar position using a python implementation of the
     NREL SPA algorithm described in [1].
@@ -224,11 +875,19 @@ def spa_python(time, location, pressure=101325, temperature=12, delta_t=None,
 
     Parameters
     ----------
-    time : pandas.DatetimeIndex
+    time : pandas.DatetimeIndex or numpy array
+        A numpy array of numbers is taken as seconds since
+        1970-01-01 00:00:00 UTC. The results are then returned as a dict
+        of numpy arrays without using pandas, which is much faster for
+        small arrays. Other times, including numpy datetime64 arrays,
+        are converted to a DatetimeIndex and localized to the location
+        if they are naive.
     location : pvlib.Location object
-    pressure : int or float, optional
+        The latitude, longitude and altitude of the location may be
+        arrays with the same length as time for a moving observer.
+    pressure : int, float or array-like, optional
         avg. yearly air pressure in Pascals.
-    temperature : int or float, optional
+    temperature : int, float or array-like, optional
         avg. yearly air temperature in degrees C.
     delta_t : float, optional
         Difference between terrestrial time and UT1.
@@ -237,11 +896,32 @@ def spa_python(time, location, pressure=101325, temperature=12, delta_t=None,
         The approximate atmospheric refraction (in degrees)
         at sunrise and sunset.
     how : str, optional
-        Options are 'numpy' or 'numba'. If numba >= 0.17.0
+        Options are 'numpy' or 'numba'. If numba >= 0.34.0
         is installed, how='numba' will compile the spa functions
         to machine code and run them multithreaded.
     numthreads : int, optional
         Number of threads to use if how == 'numba'.
+    chebyshev_ephemeris : None, dict or str, optional
+        The output of :func:`pvlib.spa.chebyshev_ephemeris` or the path
+        to a file saved by :func:`pvlib.spa.save_chebyshev_ephemeris`.
+        If given, the location independent terms are interpolated from
+        the ephemeris instead of being calculated, and delta_t defaults
+        to the value used to make the ephemeris.
+    outputs : list of str, optional
+        Names of the columns to return. With how='numpy', only the
+        requested outputs and the terms they depend on are calculated.
+    interpolate : None or float, optional
+        Seconds between anchor times. If given, the location independent
+        terms are calculated exactly at the anchor times and interpolated
+        for the other times, see
+        :func:`pvlib.spa.geocentric_position_interpolated`. The observer
+        dependent terms are calculated exactly for every time. Much
+        faster for high frequency times such as 1 second data.
+    tolerance : None or float, optional
+        Maximum error in degrees of the sun position, e.g. 0.01.
+        If given, the smallest periodic terms of the SPA are dropped
+        while the error bound stays within tolerance for 1900-2100,
+        see :func:`pvlib.spa.truncated_series`.
 
     Returns
     -------
@@ -253,6 +933,9 @@ def spa_python(time, location, pressure=101325, temperature=12, delta_t=None,
         elevation (degrees),
         azimuth (degrees),
         equation_of_time (minutes).
+        or the columns named in outputs.
+        If time is a numpy array, a dict of numpy arrays with the
+        same keys is returned instead.
 
 
     References
@@ -278,28 +961,63 @@ def spa_python(time, location, pressure=101325, temperature=12, delta_t=None,
     lon = location.longitude
     elev = location.altitude
     pressure = pressure / 100  # pressure must be in millibars for calculation
-    delta_t = delta_t or 67.0
     atmos_refract = atmos_refract or 0.5667
 
-    if not isinstance(time, pd.DatetimeIndex):
-        try:
-            time = pd.DatetimeIndex(time)
-        except (TypeError, ValueError):
-            time = pd.DatetimeIndex([time, ])
+    unixtime = _epoch_array(time)
+    if unixtime is None:
+        if not isinstance(time, pd.DatetimeIndex):
+            try:
+                time = pd.DatetimeIndex(time)
+            except (TypeError, ValueError):
+                time = pd.DatetimeIndex([time, ])
 
-    unixtime = localize_to_utc(time, location).astype(np.int64)/10**9
+        unixtime = localize_to_utc(time, location).astype(np.int64)/10**9
 
     spa = _spa_python_import(how)
 
-    app_zenith, zenith, app_elevation, elevation, azimuth, eot = spa.solar_position(
-        unixtime, lat, lon, elev, pressure, temperature, delta_t,
-        atmos_refract, numthreads)
+    if chebyshev_ephemeris is not None and interpolate is not None:
+        raise ValueError('chebyshev_ephemeris and interpolate can not be '
+                         'used together')
+    if tolerance is not None and (chebyshev_ephemeris is not None or
+                                  interpolate is not None):
+        raise ValueError('tolerance can not be used with '
+                         'chebyshev_ephemeris or interpolate')
+
+    if chebyshev_ephemeris is not None:
+        if not isinstance(chebyshev_ephemeris, dict):
+            chebyshev_ephemeris = spa.load_chebyshev_ephemeris(
+                chebyshev_ephemeris)
+        if (delta_t is not None and
+                delta_t != chebyshev_ephemeris['delta_t']):
+            raise ValueError('delta_t does not match the delta_t of the '
+                             'chebyshev_ephemeris')
+        spa_out = spa.solar_position_chebyshev(
+            unixtime, chebyshev_ephemeris, lat, lon, elev, pressure,
+            temperature, atmos_refract)
+    elif interpolate is not None:
+        delta_t = delta_t or 67.0
+        spa_out = spa.solar_position_interpolated(
+            unixtime, lat, lon, elev, pressure, temperature, delta_t,
+            atmos_refract, interpolate)
+    else:
+        delta_t = delta_t or 67.0
+        spa_out = spa.solar_position(unixtime, lat, lon, elev, pressure,
+                                     temperature, delta_t, atmos_refract,
+                                     numthreads, outputs=outputs,
+                                     tolerance=tolerance)
+
+    if outputs is not None and (chebyshev_ephemeris is not None or
+                                interpolate is not None):
+        spa_out = [spa_out[spa.SOLAR_POSITION_OUTPUTS.index(name)]
+                   for name in outputs]
+
+    columns = list(outputs or spa.SOLAR_POSITION_OUTPUTS)
+    result = dict(zip(columns, spa_out))
+
+    if isinstance(time, np.ndarray):
+        return result
 
-    result = pd.DataFrame({'apparent_zenith': app_zenith, 'zenith': zenith,
-                           'apparent_elevation': app_elevation,
-                           'elevation': elevation, 'azimuth': azimuth,
-                           'equation_of_time': eot},
-                          index=time)
+    result = pd.DataFrame(result, index=time, columns=columns)
 
     try:
         result = result.tz_convert(location.tz)
@@ -309,6 +1027,122 @@ def spa_python(time, location, pressure=101325, temperature=12, delta_t=None,
     return result
 
 
+def spa_python_multisite(time, locations, pressure=101325, temperature=12,
+                         delta_t=None, atmos_refract=None, how='numpy',
+                         numthreads=4):
+    """
+    Calculate the solar position at many locations using a python
+    implementation of the NREL SPA algorithm described in [1].
+
+    The location independent terms of the algorithm are calculated
+    once for each distinct set of UTC times and are shared by all of
+    the locations, so the cost for each additional location is
+    only the topocentric part of the calculation.
+
+    Parameters
+    ----------
+    time : pandas.DatetimeIndex or numpy array
+        If time is not localized, it is localized to the timezone of
+        each location. A numpy array of numbers is taken as UTC epoch
+        seconds, see :func:`spa_python`.
+    locations : list of pvlib.Location objects
+    pressure : int or float, optional
+        avg. yearly air pressure in Pascals.
+    temperature : int or float, optional
+        avg. yearly air temperature in degrees C.
+    delta_t : float, optional
+        Difference between terrestrial time and UT1.
+        The USNO has historical and forecasted delta_t [3].
+    atmos_refrac : float, optional
+        The approximate atmospheric refraction (in degrees)
+        at sunrise and sunset.
+    how : str, optional
+        Options are 'numpy' or 'numba'. If numba >= 0.34.0
+        is installed, how='numba' will compile the spa functions
+        to machine code and run them multithreaded.
+    numthreads : int, optional
+        Number of threads to use if how == 'numba'.
+
+    Returns
+    -------
+    list of DataFrames
+        One DataFrame for each location, in the same order as locations,
+        with the same columns as :func:`spa_python`. If time is a
+        numpy array, a list of dicts of numpy arrays is returned instead.
+
+    References
+    ----------
+    [1] I. Reda and A. Andreas, Solar position algorithm for solar
+    radiation applications. Solar Energy, vol. 76, no. 5, pp. 577-589, 2004.
+
+    [2] I. Reda and A. Andreas, Corrigendum to Solar position algorithm for
+    solar radiation applications. Solar Energy, vol. 81, no. 6, p. 838, 2007.
+
+    [3] USNO delta T: http://www.usno.navy.mil/USNO/earth-orientation/eo-products/long-term
+
+    See also
+    --------
+    spa_python, get_solarposition
+    """
+
+    pvl_logger.debug('Calculating solar position at %s locations with '
+                     'spa_python code', len(locations))
+
+    pressure = pressure / 100  # pressure must be in millibars for calculation
+    delta_t = delta_t or 67.0
+    atmos_refract = atmos_refract or 0.5667
+
+    columns = ['apparent_zenith', 'zenith', 'apparent_elevation',
+               'elevation', 'azimuth', 'equation_of_time']
+
+    spa = _spa_python_import(how)
+
+    unixtime = _epoch_array(time)
+    if unixtime is not None:
+        out = spa.solar_position_multisite(
+            unixtime, [loc.latitude for loc in locations],
+            [loc.longitude for loc in locations],
+            [loc.altitude for loc in locations], pressure, temperature,
+            delta_t, atmos_refract, numthreads)
+        return [dict(zip(columns, out[:, j])) for j in range(len(locations))]
+
+    if not isinstance(time, pd.DatetimeIndex):
+        try:
+            time = pd.DatetimeIndex(time)
+        except (TypeError, ValueError):
+            time = pd.DatetimeIndex([time, ])
+
+    # localized times are the same for every location, but naive times
+    # are interpreted in each location's timezone. group the locations
+    # by timezone so that the geocentric terms are calculated once per group
+    if time.tz is None:
+        groups = {}
+        for i, location in enumerate(locations):
+            groups.setdefault(location.tz, []).append(i)
+    else:
+        groups = {None: list(range(len(locations)))}
+
+    results = [None] * len(locations)
+    for indices in groups.values():
+        group = [locations[i] for i in indices]
+        unixtime = localize_to_utc(time, group[0]).astype(np.int64)/10**9
+        out = spa.solar_position_multisite(
+            unixtime, [loc.latitude for loc in group],
+            [loc.longitude for loc in group],
+            [loc.altitude for loc in group], pressure, temperature, delta_t,
+            atmos_refract, numthreads)
+        for j, (i, location) in enumerate(zip(indices, group)):
+            result = pd.DataFrame(dict(zip(columns, out[:, j])), index=time,
+                                  columns=columns)
+            try:
+                result = result.tz_convert(location.tz)
+            except TypeError:
+                result = result.tz_localize(location.tz)
+            results[i] = result
+
+    return results
+
+
 def get_sun_rise_set_transit(time, location, how='numpy', delta_t=None,
                              numthreads=4):
     """
@@ -324,12 +1158,13 @@ def get_sun_rise_set_transit(time, location, how='numpy', delta_t=None,
     ----------
     time : pandas.DatetimeIndex
         Only the date part is used
-    location : pvlib.Location object
+    location : pvlib.Location object or list of Location objects
+        If a list, all of the locations are calculated in one pass.
     delta_t : float, optional
         Difference between terrestrial time and UT1.
         By default, use USNO historical data and predictions
     how : str, optional
-        Options are 'numpy' or 'numba'. If numba >= 0.17.0
+        Options are 'numpy' or 'numba'. If numba >= 0.34.0
         is installed, how='numba' will compile the spa functions
         to machine code and run them multithreaded.
     numthreads : int, optional
@@ -337,9 +1172,15 @@ def get_sun_rise_set_transit(time, location, how='numpy', delta_t=None,
 
     Returns
     -------
-    DataFrame
+    DataFrame or list of DataFrames
         The DataFrame will have the following columns:
-        sunrise, sunset, transit
+        sunrise, sunset, transit.
+        A list with one DataFrame for each location if location is a list.
+
+    Notes
+    -----
+    Each distinct date in time is calculated once, and the location
+    independent part of the calculation is shared by all of the locations.
 
     References
     ----------
@@ -351,8 +1192,10 @@ def get_sun_rise_set_transit(time, location, how='numpy', delta_t=None,
 
     pvl_logger.debug('Calculating sunrise, set, transit with spa_python code')
 
-    lat = location.latitude
-    lon = location.longitude
+    locations = location if isinstance(location, (list, tuple)) else [
+        location]
+    lat = np.array([loc.latitude for loc in locations])[:, np.newaxis]
+    lon = np.array([loc.longitude for loc in locations])[:, np.newaxis]
     delta_t = delta_t or 67.0
 
     if not isinstance(time, pd.DatetimeIndex):
@@ -362,25 +1205,180 @@ def get_sun_rise_set_transit(time, location, how='numpy', delta_t=None,
             time = pd.DatetimeIndex([time, ])
 
     # must convert to midnight UTC on day of interest
-    utcday = pd.DatetimeIndex(time.date).tz_localize('UTC')
-    unixtime = utcday.astype(np.int64)/10**9
+    if time.tz is not None:
+        utcday = time.tz_localize(None)
+    else:
+        utcday = time
+    utcday = utcday.values.astype('datetime64[D]')
+    utcday, inverse = np.unique(utcday, return_inverse=True)
+    unixtime = utcday.astype('datetime64[s]').astype(np.int64).astype(
+        np.float64)
 
     spa = _spa_python_import(how)
 
     transit, sunrise, sunset = spa.transit_sunrise_sunset(
         unixtime, lat, lon, delta_t, numthreads)
 
-    # arrays are in seconds since epoch format, need to conver to timestamps
-    transit = pd.to_datetime(transit, unit='s', utc=True).tz_convert(
-        location.tz).tolist()
-    sunrise = pd.to_datetime(sunrise, unit='s', utc=True).tz_convert(
-        location.tz).tolist()
-    sunset = pd.to_datetime(sunset, unit='s', utc=True).tz_convert(
-        location.tz).tolist()
+    results = []
+    for i, loc in enumerate(locations):
+        # arrays are in seconds since epoch format, need to convert to
+        # timestamps
+        columns = [pd.to_datetime(event[i, inverse], unit='s',
+                                  utc=True).tz_convert(loc.tz)
+                   for event in (transit, sunrise, sunset)]
+        result = pd.DataFrame(dict(zip(('transit', 'sunrise', 'sunset'),
+                                       columns)), index=time)
+
+        try:
+            result = result.tz_convert(loc.tz)
+        except TypeError:
+            result = result.tz_localize(loc.tz)
+        results.append(result)
+
+    if isinstance(location, (list, tuple)):
+        return results
+    return results[0]
+
+
+def _interval_integrals(lat, dec, hour_angle, half_width):
+    """
+    Integrate the sun's direction, weighted by the cosine of the zenith,
+    over the hour angles hour_angle - half_width to hour_angle +
+    half_width where the sun is above the horizon. All angles in radians.
+
+    Returns the integrals of cos(zenith), of the east, north and up
+    components of the sun's unit vector times cos(zenith), and the width
+    of the part of the interval with the sun above the horizon.
+    """
+    a = np.sin(lat) * np.sin(dec)
+    b = np.cos(lat) * np.cos(dec)
+    c = np.cos(lat) * np.sin(dec)
+    d = np.sin(lat) * np.cos(dec)
+
+    # the sun is up for hour angles within sunset_angle of 0 mod 2 pi
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(b > 0, -a / b, -np.sign(a))
+    sunset_angle = np.arccos(np.clip(ratio, -1, 1))
+    sunset_angle = np.where(ratio <= -1, np.pi, sunset_angle)
+
+    hour_angle = (hour_angle + np.pi) % (2 * np.pi) - np.pi
+    start = hour_angle - half_width
+    end = hour_angle + half_width
+
+    cos_zen = 0.
+    east = 0.
+    north = 0.
+    up = 0.
+    width = 0.
+    for k in (-1, 0, 1):
+        lo = np.maximum(start, 2 * np.pi * k - sunset_angle)
+        hi = np.minimum(end, 2 * np.pi * k + sunset_angle)
+        hi = np.where((hi > lo) & (sunset_angle > 0), hi, lo)
+        delta = hi - lo
+        dsin = np.sin(hi) - np.sin(lo)
+        dcos = np.cos(hi) - np.cos(lo)
+        dsin2 = (np.sin(2 * hi) - np.sin(2 * lo)) / 4
+        dsinsq = (np.sin(hi)**2 - np.sin(lo)**2) / 2
+        cos_zen = cos_zen + a * delta + b * dsin
+        east = east - np.cos(dec) * (-a * dcos + b * dsinsq)
+        north = north + (a * c * delta + (b * c - a * d) * dsin -
+                         b * d * (delta / 2 + dsin2))
+        up = up + (a**2 * delta + 2 * a * b * dsin +
+                   b**2 * (delta / 2 + dsin2))
+        width = width + delta
+
+    return cos_zen, east, north, up, width
+
+
+def get_interval_solarposition(time, location, interval='1h', label='right',
+                               delta_t=None):
+    """
+    Calculate the interval averaged cosine of the zenith and the
+    irradiance weighted zenith and azimuth for intervals of time.
+
+    The NREL SPA algorithm [1] is evaluated once at the middle of each
+    interval. Over the interval the declination is held constant and the
+    hour angle advances at 15 degrees per hour, and the averages are
+    calculated in closed form, including only the part of the interval
+    with the sun above the horizon. No atmospheric refraction is applied.
+
+    Parameters
+    ----------
+    time : pandas.DatetimeIndex
+        Labels of the intervals, e.g. the hour-ending index of TMY data.
+    location : pvlib.Location object
+    interval : str or pandas.Timedelta, optional
+        Length of the intervals, less than one day.
+    label : str, optional
+        'right' if time is the end of each interval, as for TMY data,
+        'left' if it is the start and 'center' if it is the middle.
+    delta_t : float, optional
+        Difference between terrestrial time and UT1.
+
+    Returns
+    -------
+    DataFrame
+        The DataFrame will have the following columns:
+        cos_zenith, the average over the whole interval of the cosine of
+        the zenith while the sun is up, zero at night.
+        zenith and azimuth (degrees), the direction of the average of
+        the sun's direction weighted by cos(zenith), NaN if the sun is
+        below the horizon for the whole interval.
+        elevation (degrees), 90 - zenith.
+        sun_fraction, the fraction of the interval with the sun up.
 
-    result = pd.DataFrame({'transit': transit,
-                           'sunrise': sunrise,
-                           'sunset': sunset}, index=time)
+    References
+    ----------
+    [1] I. Reda and A. Andreas, Solar position algorithm for solar
+    radiation applications. Solar Energy, vol. 76, no. 5, pp. 577-589, 2004.
+
+    See also
+    --------
+    get_solarposition, spa_python
+    """
+
+    pvl_logger.debug('Calculating interval averaged solar position')
+
+    seconds = pd.Timedelta(interval).total_seconds()
+    if not 0 < seconds < 86400:
+        raise ValueError('interval must be between 0 and 1 day')
+    offsets = {'right': -seconds / 2, 'left': seconds / 2, 'center': 0}
+    if label not in offsets:
+        raise ValueError("label must be 'right', 'left' or 'center'")
+
+    if not isinstance(time, pd.DatetimeIndex):
+        time = pd.DatetimeIndex(time)
+
+    unixtime = (localize_to_utc(time, location).astype(np.int64)/10**9 +
+                offsets[label])
+
+    spa = _spa_python_import('numpy')
+    v, alpha, delta, xi, eot = spa.geocentric_position_numpy(
+        unixtime, delta_t or 67.0, eot=False)
+    e0, dec, hour_angle = spa.topocentric_sun_position(
+        v, alpha, delta, xi, location.latitude, location.longitude,
+        location.altitude)
+
+    half_width = np.pi * seconds / 86400
+    cos_zen, east, north, up, width = _interval_integrals(
+        np.radians(location.latitude), np.radians(dec),
+        np.radians(hour_angle), half_width)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sun = cos_zen > 0
+        zenith = np.where(sun, np.degrees(np.arctan2(np.hypot(east, north),
+                                                     up)), np.nan)
+        azimuth = np.where(sun, np.degrees(np.arctan2(east, north)) % 360,
+                           np.nan)
+
+    result = pd.DataFrame({'cos_zenith': np.maximum(cos_zen, 0) /
+                           (2 * half_width),
+                           'zenith': zenith, 'elevation': 90 - zenith,
+                           'azimuth': azimuth,
+                           'sun_fraction': width / (2 * half_width)},
+                          index=time,
+                          columns=['cos_zenith', 'zenith', 'elevation',
+                                   'azimuth', 'sun_fraction'])
 
     try:
         result = result.tz_convert(location.tz)
@@ -390,6 +1388,143 @@ def get_sun_rise_set_transit(time, location, how='numpy', delta_t=None,
     return result
 
 
+def get_elevation_crossings(time, location, thresholds, apparent=True,
+                            pressure=101325, temperature=12, delta_t=None,
+                            atmos_refract=None, how='numpy', numthreads=4,
+                            xtol=1.0):
+    """
+    Find the times when the sun's elevation crosses thresholds, rising
+    and setting, for many days, thresholds and locations in one call.
+
+    The crossings are found with a bracketed bisection that evaluates
+    the NREL SPA algorithm [1] for all of the days, thresholds and
+    locations at once in each step. The rising crossing is searched for
+    between the solar antitransit and transit, and the setting crossing
+    between the transit and the next antitransit.
+
+    Parameters
+    ----------
+    time : pandas.DatetimeIndex
+        Only the date part of each time is used, in the timezone of each
+        location. Times on the same date give the same crossings.
+    location : pvlib.Location object or list of Location objects
+    thresholds : float or list of float
+        Elevation angles in degrees.
+    apparent : bool, optional
+        If True, the apparent elevation, including atmospheric
+        refraction, is used, otherwise the geometric elevation.
+    pressure : int or float, optional
+        avg. yearly air pressure in Pascals.
+    temperature : int or float, optional
+        avg. yearly air temperature in degrees C.
+    delta_t : float, optional
+        Difference between terrestrial time and UT1.
+    atmos_refract : float, optional
+        The approximate atmospheric refraction (in degrees)
+        at sunrise and sunset.
+    how : str, optional
+        Options are 'numpy' or 'numba', see :func:`spa_python`.
+    numthreads : int, optional
+        Number of threads to use if how == 'numba'.
+    xtol : float, optional
+        Tolerance of the crossing times in seconds.
+
+    Returns
+    -------
+    DataFrame or list of DataFrames
+        One DataFrame for each location, indexed by time with one row
+        for each input time, with columns (threshold, 'rise') and
+        (threshold, 'set') of localized timestamps on the local date of
+        that time. NaT if the elevation does not cross the threshold
+        in that half of the day.
+
+    References
+    ----------
+    [1] I. Reda and A. Andreas, Solar position algorithm for solar
+    radiation applications. Solar Energy, vol. 76, no. 5, pp. 577-589, 2004.
+
+    See also
+    --------
+    calc_time, get_sun_rise_set_transit
+    """
+
+    locations = location if isinstance(location, (list, tuple)) else [
+        location]
+    thresholds = np.atleast_1d(np.asarray(thresholds, dtype=np.float64))
+    delta_t = delta_t or 67.0
+    atmos_refract = atmos_refract or 0.5667
+    output = 'apparent_elevation' if apparent else 'elevation'
+
+    if not isinstance(time, pd.DatetimeIndex):
+        time = pd.DatetimeIndex(time)
+    # unix time of midnight UTC of each date
+    days = (pd.DatetimeIndex(time.date).astype(np.int64)/10**9).values
+
+    spa = _spa_python_import(how)
+
+    lats = np.array([loc.latitude for loc in locations], dtype=np.float64)
+    lons = np.array([loc.longitude for loc in locations], dtype=np.float64)
+    elevs = np.array([loc.altitude for loc in locations], dtype=np.float64)
+
+    # estimate the transit from the longitude, then correct it with the
+    # equation of time at the estimate. shape (locations, days)
+    transit = days + 43200 - lons[:, np.newaxis] * 240
+    eot = spa.solar_position(transit.ravel(), 0, 0, 0, 0, 0, delta_t,
+                             atmos_refract, numthreads,
+                             outputs=['equation_of_time'])[0]
+    transit -= eot.reshape(transit.shape) * 60
+
+    # one problem per (location, day, threshold, rise/set)
+    shape = (len(locations), len(days), len(thresholds), 2)
+    transit = np.broadcast_to(transit[:, :, np.newaxis, np.newaxis],
+                              shape).ravel()
+    sign = np.broadcast_to(np.array([1., -1.]), shape).ravel()
+    target = np.broadcast_to(thresholds[:, np.newaxis], shape).ravel()
+    site = np.broadcast_to(np.arange(len(locations))[:, None, None, None],
+                           shape).ravel()
+    lo = np.where(sign > 0, transit - 43200, transit)
+    hi = np.where(sign > 0, transit, transit + 43200)
+
+    def func(unixtime, index):
+        site_index = site[index]
+        elevation = spa.solar_position(unixtime, lats[site_index],
+                                       lons[site_index], elevs[site_index],
+                                       pressure / 100, temperature, delta_t,
+                                       atmos_refract, numthreads,
+                                       outputs=[output])[0]
+        return sign[index] * (elevation - target[index])
+
+    everything = np.arange(sign.shape[0])
+    valid = (func(lo, everything) < 0) & (func(hi, everything) >= 0)
+    # only the bracketed crossings are bisected
+    index = np.flatnonzero(valid)
+    lo = lo[index]
+    hi = hi[index]
+    pvl_logger.debug('Solving for %s elevation crossings', index.shape[0])
+    while np.any(hi - lo > xtol):
+        mid = (lo + hi) / 2
+        below = func(mid, index) < 0
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    crossing = np.full(sign.shape[0], np.nan)
+    crossing[index] = (lo + hi) / 2
+    crossing = crossing.reshape(len(locations), len(days), -1)
+
+    columns = pd.MultiIndex.from_product([thresholds, ['rise', 'set']])
+    results = []
+    for i, loc in enumerate(locations):
+        result = pd.DataFrame(index=time, columns=columns)
+        for j, column in enumerate(columns):
+            # NaN, where there is no crossing, becomes NaT
+            result[column] = pd.to_datetime(
+                crossing[i, :, j], unit='s', utc=True).tz_convert(loc.tz)
+        results.append(result)
+
+    if isinstance(location, (list, tuple)):
+        return results
+    return results[0]
+
+
 def _ephem_setup(location, pressure, temperature):
     import ephem
     # initialize a PyEphem observer
@@ -405,7 +1540,35 @@ def _ephem_setup(location, pressure, temperature):
     return obs, sun
 
 
-def pyephem(time, location, pressure=101325, temperature=12):
+def _pyephem_chunk(args):
+    """
+    Calculate the apparent and geometric elevation and azimuth in
+    radians for an array of Dublin Julian Days in one pass.
+    Returns an array with shape (4, len(djd)).
+    """
+    djd, location, pressure, temperature = args
+
+    obs, sun = _ephem_setup(location, pressure, temperature)
+    pressure_mbar = obs.pressure
+
+    out = np.empty((4, len(djd)))
+    for i, date in enumerate(djd):
+        obs.date = date
+        obs.pressure = pressure_mbar
+        sun.compute(obs)
+        out[0, i] = sun.alt
+        out[1, i] = sun.az
+        # no atmosphere for the geometric alt/az
+        obs.pressure = 0
+        sun.compute(obs)
+        out[2, i] = sun.alt
+        out[3, i] = sun.az
+
+    return out
+
+
+def pyephem(time, location, pressure=101325, temperature=12,
+            chunksize=None, processes=None):
     """
     Calculate the solar position using the PyEphem package.
 
@@ -417,6 +1580,13 @@ def pyephem(time, location, pressure=101325, temperature=12):
         air pressure in Pascals.
     temperature : int or float, optional
         air temperature in degrees C.
+    chunksize : int or None, optional
+        Number of times calculated by each task. Defaults to all of
+        the times if processes is None, or to an equal share of the
+        times for each process.
+    processes : int or None, optional
+        Number of worker processes used to calculate the chunks.
+        If None, the chunks are calculated in this process.
 
     Returns
     -------
@@ -442,38 +1612,43 @@ def pyephem(time, location, pressure=101325, temperature=12):
 
     time_utc = localize_to_utc(time, location)
 
-    sun_coords = pd.DataFrame(index=time_utc)
+    # Dublin Julian Day, days since 1899-12-31 12:00 UTC
+    djd = time_utc.astype(np.int64)/(10**9 * 86400.) + 25567.5
 
-    obs, sun = _ephem_setup(location, pressure, temperature)
+    if chunksize is None:
+        chunksize = int(np.ceil(len(djd) / (processes or 1))) or 1
+    tasks = [(djd[i:i + chunksize], location, pressure, temperature)
+             for i in range(0, len(djd), chunksize)]
 
-    # make and fill lists of the sun's altitude and azimuth
-    # this is the pressure and temperature corrected apparent alt/az.
-    alts = []
-    azis = []
-    for thetime in sun_coords.index:
-        obs.date = ephem.Date(thetime)
-        sun.compute(obs)
-        alts.append(sun.alt)
-        azis.append(sun.az)
-
-    sun_coords['apparent_elevation'] = alts
-    sun_coords['apparent_azimuth'] = azis
-
-    # redo it for p=0 to get no atmosphere alt/az
-    obs.pressure = 0
-    alts = []
-    azis = []
-    for thetime in sun_coords.index:
-        obs.date = ephem.Date(thetime)
-        sun.compute(obs)
-        alts.append(sun.alt)
-        azis.append(sun.az)
+    pvl_logger.debug('pyephem calculating %s chunks of %s times with %s '
+                     'processes', len(tasks), chunksize, processes)
 
-    sun_coords['elevation'] = alts
-    sun_coords['azimuth'] = azis
+    if processes is None or len(tasks) < 2:
+        results = [_pyephem_chunk(task) for task in tasks]
+    else:
+        import multiprocessing
+        # start new interpreters rather than forking this one, which may
+        # have numba threads running that are not safe to fork.
+        if hasattr(multiprocessing, 'get_context'):
+            pool = multiprocessing.get_context('spawn').Pool(processes)
+        else:
+            pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(_pyephem_chunk, tasks)
+        finally:
+            pool.close()
+            pool.join()
 
-    # convert to degrees. add zenith
-    sun_coords = np.rad2deg(sun_coords)
+    if results:
+        result = np.rad2deg(np.concatenate(results, axis=1))
+    else:
+        result = np.empty((4, 0))
+
+    sun_coords = pd.DataFrame(index=time_utc)
+    sun_coords['apparent_elevation'] = result[0]
+    sun_coords['apparent_azimuth'] = result[1]
+    sun_coords['elevation'] = result[2]
+    sun_coords['azimuth'] = result[3]
     sun_coords['apparent_zenith'] = 90 - sun_coords['apparent_elevation']
     sun_coords['zenith'] = 90 - sun_coords['elevation']
 
@@ -560,14 +1735,15 @@ def ephemeris(time, location, pressure=101325, temperature=12):
     time_utc = localize_to_utc(time, location)
 
     # strip out the day of the year and calculate the decimal hour
-    DayOfYear = time_utc.dayofyear
-    DecHours = (time_utc.hour + time_utc.minute/60. + time_utc.second/3600. +
-                time_utc.microsecond/3600.e6)
+    DayOfYear = np.asarray(time_utc.dayofyear)
+    DecHours = np.asarray(time_utc.hour + time_utc.minute/60. +
+                          time_utc.second/3600. +
+                          time_utc.microsecond/3600.e6)
 
     UnivDate = DayOfYear
     UnivHr = DecHours
 
-    Yr = time_utc.year - 1900
+    Yr = np.asarray(time_utc.year) - 1900
     YrBegin = 365 * Yr + np.floor((Yr - 1) / 4.) - 0.5
 
     Ezero = YrBegin + UnivDate
@@ -592,12 +1768,15 @@ def ephemeris(time, location, pressure=101325, temperature=12):
     MeanAnom = np.mod((358.47583 + 0.985600267 * EpochDate - 0.00015 *
                        T1 ** 2 - 3e-06 * T1 ** 3), 360)
     Eccen = 0.01675104 - 4.18e-05 * T1 - 1.26e-07 * T1 ** 2
-    EccenAnom = MeanAnom
-    E = 0
+    EccenAnom = np.array(MeanAnom, dtype=np.float64)
 
-    while np.max(abs(EccenAnom - E)) > 0.0001:
-        E = EccenAnom
-        EccenAnom = MeanAnom + np.degrees(Eccen)*np.sin(np.radians(E))
+    # only iterate the elements that have not converged yet
+    active = np.arange(EccenAnom.shape[0])
+    while active.size > 0:
+        E = EccenAnom[active]
+        EccenAnom[active] = (MeanAnom[active] +
+                             np.degrees(Eccen[active])*np.sin(np.radians(E)))
+        active = active[abs(EccenAnom[active] - E) > 0.0001]
 
     TrueAnom = (
         2 * np.mod(np.degrees(np.arctan2(((1 + Eccen) / (1 - Eccen)) ** 0.5 *
@@ -626,20 +1805,23 @@ def ephemeris(time, location, pressure=101325, temperature=12):
 
     # Calculate refraction correction
     Elevation = SunEl
-    TanEl = pd.Series(np.tan(np.radians(Elevation)), index=time_utc)
-    Refract = pd.Series(0, index=time_utc)
+    TanEl = np.tan(np.radians(Elevation))
+    Refract = np.zeros_like(Elevation)
 
-    Refract[(Elevation > 5) & (Elevation <= 85)] = (
-        58.1/TanEl - 0.07/(TanEl**3) + 8.6e-05/(TanEl**5))
+    mask = (Elevation > 5) & (Elevation <= 85)
+    Refract[mask] = (58.1/TanEl[mask] - 0.07/(TanEl[mask]**3) +
+                     8.6e-05/(TanEl[mask]**5))
 
-    Refract[(Elevation > -0.575) & (Elevation <= 5)] = (
-        Elevation *
-        (-518.2 + Elevation*(103.4 + Elevation*(-12.79 + Elevation*0.711))) +
-        1735)
+    mask = (Elevation > -0.575) & (Elevation <= 5)
+    El = Elevation[mask]
+    Refract[mask] = (
+        El * (-518.2 + El*(103.4 + El*(-12.79 + El*0.711))) + 1735)
 
-    Refract[(Elevation > -1) & (Elevation <= -0.575)] = -20.774 / TanEl
+    mask = (Elevation > -1) & (Elevation <= -0.575)
+    Refract[mask] = -20.774 / TanEl[mask]
 
-    Refract *= (283/(273. + temperature)) * (pressure/101325.) / 3600.
+    Refract *= ((283/(273. + np.asarray(temperature))) *
+                (np.asarray(pressure)/101325.) / 3600.)
 
     ApparentSunEl = SunEl + Refract
 
@@ -715,6 +1897,53 @@ def calc_time(lower_bound, upper_bound, location, attribute, value,
     return djd_to_datetime(djd_root, location.tz)
 
 
+def nrel_earthsun_distance(time, how='numpy', delta_t=None):
+    """
+    Calculates the distance from the earth to the sun using the
+    NREL SPA algorithm described in [1].
+
+    Parameters
+    ----------
+    time : pd.DatetimeIndex
+    how : str, optional
+        Options are 'numpy' or 'numba'. If numba >= 0.34.0
+        is installed, how='numba' will compile the spa functions
+        to machine code.
+    delta_t : float, optional
+        Difference between terrestrial time and UT1.
+        By default, use USNO historical data and predictions
+
+    Returns
+    -------
+    pd.Series. Earth-sun distance in AU.
+
+    References
+    ----------
+    [1] Reda, I., Andreas, A., 2003. Solar position algorithm for solar
+    radiation applications. Technical report: NREL/TP-560- 34302. Golden,
+    USA, http://www.nrel.gov.
+    """
+    pvl_logger.debug('solarposition.nrel_earthsun_distance()')
+
+    if not isinstance(time, pd.DatetimeIndex):
+        try:
+            time = pd.DatetimeIndex(time)
+        except (TypeError, ValueError):
+            time = pd.DatetimeIndex([time, ])
+
+    if time.tz is not None:
+        unixtime = time.tz_convert('UTC').tz_localize(None)
+    else:
+        unixtime = time
+    unixtime = unixtime.values.astype('datetime64[ns]').astype(
+        np.int64) / 10**9
+
+    spa = _spa_python_import(how)
+    delta_t = delta_t or 67.0
+
+    return pd.Series(spa.earthsun_distance(unixtime, delta_t), index=time)
+
+
 def pyephem_earthsun_distance(time):
     """
     Calculates the distance from the earth to the sun using pyephem.
@@ -738,3 +1967,187 @@ def pyephem_earthsun_distance(time):
         earthsun.append(sun.earth_distance)
 
     return pd.Series(earthsun, index=time)
+
+
+# predicted seconds of the nrel methods for method='auto': warmup is only
+# added if the method has not been loaded in the process yet, e.g. the
+# numba compilation or loading from the numba cache, and a call for n
+# times takes overhead + n * per_time. Replaced by load_auto_calibration.
+AUTO_CALIBRATION = {
+    'nrel_numpy': {'warmup': 0.0, 'overhead': 3e-3, 'per_time': 3e-6},
+    'nrel_numba': {'warmup': 2.0, 'overhead': 1e-3, 'per_time': 4e-7},
+    'nrel_c': {'warmup': 0.0, 'overhead': 1e-3, 'per_time': 1e-6},
+}
+
+_auto_calibration = AUTO_CALIBRATION
+
+# keywords of get_solarposition that spa_c accepts, other keywords
+# exclude 'nrel_c' from method='auto'
+AUTO_SPA_C_KWARGS = ('delta_t', 'numthreads')
+
+
+def _auto_method_status(method):
+    """Return (available, warm, reason) for one of the methods of
+    AUTO_CALIBRATION without loading it"""
+    if method == 'nrel_numpy':
+        return True, True, 'always available'
+    if method == 'nrel_numba':
+        try:
+            from numba import __version__ as numba_version
+        except ImportError:
+            return False, False, 'numba is not installed'
+        if tuple(int(x) for x in numba_version.split('.')[:2]) < (0, 34):
+            return False, False, 'numba is older than 0.34'
+        from pvlib import spa
+        warm = spa.USE_NUMBA or 'pvlib._spa_numba' in sys.modules
+        return True, warm, 'compiled' if warm else 'not compiled yet'
+    if method == 'nrel_c':
+        try:
+            from pvlib.spa_c_files import spa_py
+        except ImportError:
+            return False, False, 'the SPA C code is not compiled'
+        if not hasattr(spa_py, 'spa_calc_array'):
+            return False, False, 'the SPA C code has no array interface'
+        return True, True, 'compiled'
+    return False, False, 'unknown method'
+
+
+def select_method(size, numpy_times=False, kwargs=None, nlocations=1):
+    """
+    Choose the fastest NREL SPA method of :func:`get_solarposition`.
+
+    The time of each available method is predicted from the calibration
+    table, by default AUTO_CALIBRATION, as
+    overhead + size * per_time, plus warmup if the method has not been
+    loaded in this process yet. 'nrel_c' calculates each location in a
+    separate call, so its overhead is counted once per location. The
+    choice and the predictions are logged.
+
+    Parameters
+    ----------
+    size : int
+        Number of times, times the number of locations.
+    numpy_times : bool, optional
+        If True, 'nrel_c' is not considered because it does not accept
+        numpy array times.
+    kwargs : dict, optional
+        Other keywords of get_solarposition. 'nrel_c' is not considered
+        if any of them is not in AUTO_SPA_C_KWARGS, e.g. interpolate or
+        atmos_refract, which :func:`spa_c` does not accept.
+    nlocations : int, optional
+        Number of locations.
+
+    Returns
+    -------
+    str : 'nrel_numpy', 'nrel_numba' or 'nrel_c'
+
+    See also
+    --------
+    calibrate_auto_method, load_auto_calibration
+    """
+    calibration = _auto_calibration
+    unsupported = sorted(set(kwargs or ()) - set(AUTO_SPA_C_KWARGS))
+    predictions = {}
+    reasons = []
+    for method in sorted(calibration):
+        if numpy_times and method == 'nrel_c':
+            reasons.append('nrel_c: no numpy array times')
+            continue
+        if unsupported and method == 'nrel_c':
+            reasons.append('nrel_c: does not accept %s' %
+                           ', '.join(unsupported))
+            continue
+        available, warm, reason = _auto_method_status(method)
+        if not available:
+            reasons.append('%s: %s' % (method, reason))
+            continue
+        params = calibration[method]
+        ncalls = nlocations if method == 'nrel_c' else 1
+        predictions[method] = (params['overhead'] * ncalls +
+                               size * params['per_time'] +
+                               (0.0 if warm else params['warmup']))
+        reasons.append('%s: %s, %.3g s predicted' % (method, reason,
+                                                     predictions[method]))
+    method = min(predictions, key=predictions.get)
+    pvl_logger.info("method='auto' chose %s for %s times (%s)", method, size,
+                    '; '.join(reasons))
+    return method
+
+
+def load_auto_calibration(path=None):
+    """
+    Use the calibration table written by :func:`calibrate_auto_method`
+    for method='auto', or the shipped AUTO_CALIBRATION if path is None.
+    """
+    global _auto_calibration
+    if path is None:
+        _auto_calibration = AUTO_CALIBRATION
+        return
+    with open(path) as f:
+        calibration = json.load(f)
+    _auto_calibration = dict((method, dict(params))
+                             for method, params in calibration.items()
+                             if method in AUTO_CALIBRATION)
+
+
+def calibrate_auto_method(sizes=(1000, 100000), path=None):
+    """
+    Measure the calibration table of method='auto' on this machine and
+    use it for the rest of the process.
+
+    The overhead and per_time of each available method are fitted to
+    the fastest calls of the benchmark of the methods,
+    ``pvlib._benchmark.benchmark_methods``, for the smallest and
+    largest of sizes. The warmup of 'nrel_numba' is the time to load
+    the compiled module if it was not loaded yet, otherwise the
+    shipped value is kept.
+
+    Parameters
+    ----------
+    sizes : sequence of int, optional
+        At least two numbers of times.
+    path : str, optional
+        If given, the table is written to this file as JSON, to be used
+        in other processes with :func:`load_auto_calibration`.
+
+    Returns
+    -------
+    dict : the calibration table
+    """
+    from timeit import default_timer
+    from pvlib._benchmark import benchmark_methods
+    global _auto_calibration
+
+    sizes = sorted(sizes)
+    calibration = {}
+    methods = []
+    for method in sorted(AUTO_CALIBRATION):
+        available, warm, reason = _auto_method_status(method)
+        if not available:
+            pvl_logger.info('Not calibrating %s: %s', method, reason)
+            continue
+        calibration[method] = dict(AUTO_CALIBRATION[method])
+        if not warm:
+            start = default_timer()
+            _spa_python_import(method[5:])
+            calibration[method]['warmup'] = default_timer() - start
+        methods.append(method)
+
+    result = benchmark_methods([sizes[0], sizes[-1]], methods,
+                               numthreads=(4, ))
+    for method in methods:
+        times = result[result['method'] == method].set_index('size')['time']
+        if sizes[-1] not in times.index:
+            continue
+        per_time = ((times[sizes[-1]] - times[sizes[0]]) /
+                    (sizes[-1] - sizes[0]))
+        calibration[method]['per_time'] = max(per_time, 0.0)
+        calibration[method]['overhead'] = max(
+            times[sizes[0]] - per_time * sizes[0], 0.0)
+    pvl_logger.info('Calibrated method=\'auto\': %s', calibration)
+
+    if path is not None:
+        with open(path, 'w') as f:
+            json.dump(calibration, f, indent=1, sort_keys=True)
+    _auto_calibration = calibration
+    return calibration
@@ -8,6 +8,7 @@ numpy arrays or compiling the code to machine language with numba.
 
 from __future__ import division
 import os
+import multiprocessing
 import threading
 import warnings
 import logging
@@ -18,27 +19,45 @@ import numpy as np
 
 
 # this block is a way to use an environment variable to switch between
-# compiling the functions with numba or just use numpy
+# compiling the functions with numba or just use numpy.
+#
+# pvlib._spa_numba and pvlib._spa_numpy are copies of this module with the
+# mode fixed: they set _PVLIB_USE_NUMBA in their namespace and exec the
+# source of this file, see pvlib.solarposition._spa_python_import. The
+# code of the copies is compiled with the path of this file as its file
+# name, and numba's cache=True locates the cache entries from that file
+# name, so pvlib.spa and pvlib._spa_numba share the cache in the
+# __pycache__ next to this file. An entry records the name of the module
+# that wrote it, and numba imports that module when it loads the entry,
+# which is why the copies are importable modules rather than modules
+# made at runtime.
 def nocompile(*args, **kwargs):
     return lambda func: func
 
 
-if os.getenv('PVLIB_USE_NUMBA', '0') != '0':
+def cached_jit(*args, **kwargs):
+    """numba.jit that caches the compiled functions on disk so that
+    they are only compiled once, not in every new process"""
+    kwargs.setdefault('cache', True)
+    return jit(*args, **kwargs)
+
+
+if globals().get('_PVLIB_USE_NUMBA',
+                 os.getenv('PVLIB_USE_NUMBA', '0') != '0'):
     try:
-        from numba import jit, __version__
+        from numba import jit, prange, config, __version__
     except ImportError:
         warnings.warn('Could not import numba, falling back to numpy ' +
                       'calculation')
         jcompile = nocompile
         USE_NUMBA = False
     else:
-        major, minor = __version__.split('.')[:2]
-        if int(major + minor) >= 17:
-            # need at least numba >= 0.17.0
-            jcompile = jit
+        if tuple(int(x) for x in __version__.split('.')[:2]) >= (0, 34):
+            # need at least numba >= 0.34.0 for parallel loops
+            jcompile = cached_jit
             USE_NUMBA = True
         else:
-            warnings.warn('Numba version must be >= 0.17.0, falling back to ' +
+            warnings.warn('Numba version must be >= 0.34.0, falling back to ' +
                           'numpy')
             jcompile = nocompile
             USE_NUMBA = False
@@ -46,6 +65,21 @@ else:
     jcompile = nocompile
     USE_NUMBA = False
 
+if USE_NUMBA:
+    NUM_CORES = config.NUMBA_NUM_THREADS
+else:
+    prange = range
+    NUM_CORES = multiprocessing.cpu_count()
+
+# the compiled loops are split into chunks of at least this many elements
+# before they are spread over multiple threads
+PARALLEL_MIN_CHUNKSIZE = 512
+
+# only one parallel loop runs at a time because some numba threading
+# layers do not support concurrent launches. Other threads run the
+# serial loops instead, which release the GIL.
+_PARALLEL_LOCK = threading.Lock()
+
 
 TABLE_1_DICT = {
     'L0': np.array(
@@ -426,6 +460,254 @@ NUTATION_YTERM_ARRAY = np.array([
 ])
 
 
+# maximum size in bytes of the (terms x times) blocks used when the periodic
+# terms are evaluated as matrix products, see _sum_periodic_terms
+SERIES_BLOCK_BYTES = 8 * 2**20
+
+
+def _heliocentric_series(table):
+    """Convert a (series, rows, 3) table of periodic terms into the
+    (coefficients, phases, frequencies) form used by _sum_periodic_terms,
+    dropping the rows that only pad the table"""
+    series, rows = np.nonzero(table[:, :, 0])
+    terms = table[series, rows]
+    coeffs = np.zeros((table.shape[0], terms.shape[0]))
+    coeffs[series, np.arange(terms.shape[0])] = terms[:, 0]
+    return coeffs, terms[:, 1], terms[:, 2:3]
+
+
+HELIO_LONG_SERIES = _heliocentric_series(HELIO_LONG_TABLE)
+HELIO_LAT_SERIES = _heliocentric_series(HELIO_LAT_TABLE)
+HELIO_RADIUS_SERIES = _heliocentric_series(HELIO_RADIUS_TABLE)
+NUTATION_LONGITUDE_SERIES = (np.array(NUTATION_ABCD_ARRAY[:, :2].T),
+                             np.zeros(NUTATION_YTERM_ARRAY.shape[0]),
+                             np.radians(NUTATION_YTERM_ARRAY))
+NUTATION_OBLIQUITY_SERIES = (np.array(NUTATION_ABCD_ARRAY[:, 2:].T),
+                             np.zeros(NUTATION_YTERM_ARRAY.shape[0]),
+                             np.radians(NUTATION_YTERM_ARRAY))
+
+
+def _sum_periodic_terms(coeffs, phases, freqs, x, func, chunksize=None):
+    """
+    Evaluate coeffs @ func(phases + freqs @ x) in blocks of time.
+
+    Parameters
+    ----------
+    coeffs : numpy array
+        (series, terms) amplitude of each term in each series
+    phases : numpy array
+        (terms, ) phase of each term
+    freqs : numpy array
+        (terms, variables) frequency of each term for each variable
+    x : numpy array
+        (variables, times) values of the variables
+    func : numpy ufunc
+        np.sin or np.cos
+    chunksize : int, optional
+        Number of times in each block. By default, the blocks are
+        limited to SERIES_BLOCK_BYTES.
+
+    Returns
+    -------
+    numpy array with shape (series, times)
+    """
+    nterms = freqs.shape[0]
+    ntimes = x.shape[1]
+    if nterms == 0:
+        # every term was dropped by truncated_series
+        return np.zeros((coeffs.shape[0], ntimes), dtype=np.float64)
+    if chunksize is None:
+        chunksize = max(1, SERIES_BLOCK_BYTES // (8 * nterms))
+    out = np.empty((coeffs.shape[0], ntimes), dtype=np.float64)
+    phases = phases[:, np.newaxis]
+    for start in range(0, ntimes, chunksize):
+        block = np.dot(freqs, x[:, start:start + chunksize])
+        block += phases
+        func(block, out=block)
+        out[:, start:start + chunksize] = np.dot(coeffs, block)
+    return out
+
+
+def _horner(series, x):
+    """Evaluate sum(series[k] * x**k)"""
+    result = series[-1]
+    for k in range(series.shape[0] - 2, -1, -1):
+        result = result * x + series[k]
+    return result
+
+
+def heliocentric_longitude_batched(jme, chunksize=None,
+                                   series=HELIO_LONG_SERIES):
+    """Vectorized equivalent of heliocentric_longitude that evaluates all
+    of the periodic terms at once as a matrix product. series may be
+    replaced by a truncated series, see truncated_series"""
+    jme = np.asarray(jme, dtype=np.float64)
+    series = _sum_periodic_terms(*series, x=jme.reshape(1, -1),
+                                 func=np.cos, chunksize=chunksize)
+    l_rad = _horner(series, jme.ravel()) / 10**8
+    l = np.rad2deg(l_rad).reshape(jme.shape)
+    return l % 360
+
+
+def heliocentric_latitude_batched(jme, chunksize=None,
+                                  series=HELIO_LAT_SERIES):
+    """Vectorized equivalent of heliocentric_latitude that evaluates all
+    of the periodic terms at once as a matrix product. series may be
+    replaced by a truncated series, see truncated_series"""
+    jme = np.asarray(jme, dtype=np.float64)
+    series = _sum_periodic_terms(*series, x=jme.reshape(1, -1),
+                                 func=np.cos, chunksize=chunksize)
+    b_rad = _horner(series, jme.ravel()) / 10**8
+    b = np.rad2deg(b_rad).reshape(jme.shape)
+    return b
+
+
+def heliocentric_radius_vector_batched(jme, chunksize=None,
+                                       series=HELIO_RADIUS_SERIES):
+    """Vectorized equivalent of heliocentric_radius_vector that evaluates
+    all of the periodic terms at once as a matrix product. series may be
+    replaced by a truncated series, see truncated_series"""
+    jme = np.asarray(jme, dtype=np.float64)
+    series = _sum_periodic_terms(*series, x=jme.reshape(1, -1),
+                                 func=np.cos, chunksize=chunksize)
+    r = _horner(series, jme.ravel()) / 10**8
+    return r.reshape(jme.shape)
+
+
+def longitude_nutation_batched(julian_ephemeris_century, x0, x1, x2, x3, x4,
+                               chunksize=None,
+                               series=NUTATION_LONGITUDE_SERIES):
+    """Vectorized equivalent of longitude_nutation that evaluates all
+    of the periodic terms at once as a matrix product. series may be
+    replaced by a truncated series, see truncated_series"""
+    jce = np.asarray(julian_ephemeris_century, dtype=np.float64)
+    x = np.array(np.broadcast_arrays(jce, x0, x1, x2, x3, x4),
+                 dtype=np.float64).reshape(6, -1)
+    series = _sum_periodic_terms(*series, x=x[1:],
+                                 func=np.sin, chunksize=chunksize)
+    delta_psi = _horner(series, x[0]) * 1.0 / 36000000
+    return delta_psi.reshape(jce.shape)
+
+
+def obliquity_nutation_batched(julian_ephemeris_century, x0, x1, x2, x3, x4,
+                               chunksize=None,
+                               series=NUTATION_OBLIQUITY_SERIES):
+    """Vectorized equivalent of obliquity_nutation that evaluates all
+    of the periodic terms at once as a matrix product. series may be
+    replaced by a truncated series, see truncated_series"""
+    jce = np.asarray(julian_ephemeris_century, dtype=np.float64)
+    x = np.array(np.broadcast_arrays(jce, x0, x1, x2, x3, x4),
+                 dtype=np.float64).reshape(6, -1)
+    series = _sum_periodic_terms(*series, x=x[1:],
+                                 func=np.cos, chunksize=chunksize)
+    delta_eps = _horner(series, x[0]) * 1.0 / 36000000
+    return delta_eps.reshape(jce.shape)
+
+
+# largest magnitude of the julian ephemeris millennium and century in the
+# years 1900-2100, over which the error bound of truncated_series holds
+TRUNCATION_JME_BOUND = 0.101
+TRUNCATION_JCE_BOUND = 1.01
+
+# smallest earth-sun distance in AU (perihelion) in 1900-2100
+TRUNCATION_R_MIN = 0.983
+
+# error in degrees of the sun position per unit of error of each series:
+# degrees of heliocentric longitude, and degrees of nutation in
+# longitude, which shifts both the apparent sun longitude and the
+# apparent sidereal time. The radius vector enters through the
+# aberration correction and the parallax, which go as 1/R, so its weight
+# depends on the largest possible radius error and is computed in
+# truncated_series.
+TRUNCATION_WEIGHTS = {'L': 1.0,
+                      'delta_psi': 2.0,
+                      'delta_epsilon': 1.0}
+
+_TRUNCATED_SERIES_CACHE = {}
+
+
+def truncated_series(tolerance):
+    """
+    Drop the smallest periodic terms of the heliocentric longitude and
+    radius vector and of the nutation in longitude and obliquity.
+
+    Each term is bounded by its amplitude times the largest power of
+    the julian ephemeris millennium (or century) it is multiplied by in
+    1900-2100, scaled to degrees of sun position with
+    TRUNCATION_WEIGHTS. A radius vector error dR changes the aberration
+    and parallax, (20.4898 + 8.794) / 3600 / R degrees, by at most
+    (20.4898 + 8.794) / 3600 * dR / (R_MIN * (R_MIN - D)), where R_MIN
+    is TRUNCATION_R_MIN and D is the sum of the bounds of all the
+    periodic radius terms. The terms are dropped from the smallest bound
+    up while the sum of the bounds of the dropped terms stays within
+    tolerance, so the error of the geocentric right ascension,
+    declination and sidereal time is at most tolerance degrees. The
+    constant terms of the longitude and radius vector are always kept.
+    The heliocentric latitude has few terms and is not truncated.
+
+    Parameters
+    ----------
+    tolerance : float
+        Maximum error in degrees
+
+    Returns
+    -------
+    dict with the (coefficients, phases, frequencies) series of the
+    kept terms in the form of HELIO_LONG_SERIES for 'L', 'R',
+    'delta_psi' and 'delta_epsilon', and the sum of the bounds of the
+    dropped terms as 'error_bound'.
+    """
+    tolerance = float(tolerance)
+    if tolerance in _TRUNCATED_SERIES_CACHE:
+        return _TRUNCATED_SERIES_CACHE[tolerance]
+
+    full = {'L': HELIO_LONG_SERIES, 'R': HELIO_RADIUS_SERIES,
+            'delta_psi': NUTATION_LONGITUDE_SERIES,
+            'delta_epsilon': NUTATION_OBLIQUITY_SERIES}
+    names = []
+    bounds = []
+    for name in sorted(full):
+        coeffs, phases, freqs = full[name]
+        if name in ('L', 'R'):
+            powers = TRUNCATION_JME_BOUND ** np.arange(coeffs.shape[0])
+            bound = np.dot(powers, np.abs(coeffs)) / 10**8
+            constant = (freqs[:, 0] == 0) & (phases == 0)
+            if name == 'L':
+                bound = np.degrees(bound) * TRUNCATION_WEIGHTS['L']
+            else:
+                r_min = TRUNCATION_R_MIN
+                r_min_truncated = r_min - bound[~constant].sum()
+                bound = bound * ((20.4898 + 8.794) / 3600 /
+                                 (r_min * r_min_truncated))
+            bound[constant] = np.inf
+        else:
+            powers = TRUNCATION_JCE_BOUND ** np.arange(coeffs.shape[0])
+            bound = (np.dot(powers, np.abs(coeffs)) / 36000000 *
+                     TRUNCATION_WEIGHTS[name])
+        names.extend([name] * bound.shape[0])
+        bounds.append(bound)
+    bounds = np.concatenate(bounds)
+    names = np.array(names)
+
+    order = np.argsort(bounds, kind='mergesort')
+    ndrop = np.searchsorted(np.cumsum(bounds[order]), tolerance,
+                            side='right')
+    keep = np.ones(bounds.shape[0], dtype=bool)
+    keep[order[:ndrop]] = False
+    keep[np.isinf(bounds)] = True
+
+    result = {'error_bound': bounds[~keep].sum()}
+    for name in full:
+        coeffs, phases, freqs = full[name]
+        kept = keep[names == name]
+        result[name] = (np.array(coeffs[:, kept]), np.array(phases[kept]),
+                        np.array(freqs[kept]))
+    pvl_logger.debug('Truncated series for tolerance %s keep %s of %s terms',
+                     tolerance, keep.sum(), keep.shape[0])
+    _TRUNCATED_SERIES_CACHE[tolerance] = result
+    return result
+
+
 @jcompile('float64(int64, int64, int64, int64, int64, int64, int64)',
           nopython=True)
 def julian_day_dt(year, month, day, hour, minute, second, microsecond):
@@ -895,6 +1177,226 @@ def equation_of_time(sun_mean_longitude, geocentric_sun_right_ascension,
     return E
 
 
+@jcompile('UniTuple(float64, 5)(float64, float64, float64, float64, float64, '
+          'float64, float64, float64)', nopython=True)
+def geocentric_sun_position(jd, jc, jme, L, B, R, delta_psi, delta_epsilon):
+    """Combine the time and periodic terms into the apparent sidereal
+    time, geocentric sun right ascension and declination, equatorial
+    horizontal parallax and true ecliptic obliquity"""
+    Theta = geocentric_longitude(L)
+    beta = geocentric_latitude(B)
+    epsilon0 = mean_ecliptic_obliquity(jme)
+    epsilon = true_ecliptic_obliquity(epsilon0, delta_epsilon)
+    delta_tau = aberration_correction(R)
+    lamd = apparent_sun_longitude(Theta, delta_psi, delta_tau)
+    v0 = mean_sidereal_time(jd, jc)
+    v = apparent_sidereal_time(v0, delta_psi, epsilon)
+    alpha = geocentric_sun_right_ascension(lamd, epsilon, beta)
+    delta = geocentric_sun_declination(lamd, epsilon, beta)
+    xi = equatorial_horizontal_parallax(R)
+    return v, alpha, delta, xi, epsilon
+
+
+@jcompile('UniTuple(float64, 5)(float64, float64, float64, float64, float64, '
+          'float64, float64, float64)', nopython=True)
+def geocentric_terms(jd, jc, jme, L, B, R, delta_psi, delta_epsilon):
+    """Combine the time and periodic terms into the output of
+    geocentric_position"""
+    v, alpha, delta, xi, epsilon = geocentric_sun_position(
+        jd, jc, jme, L, B, R, delta_psi, delta_epsilon)
+    m = sun_mean_longitude(jme)
+    eot = equation_of_time(m, alpha, delta_psi, epsilon)
+    return v, alpha, delta, xi, eot
+
+
+@jcompile('UniTuple(float64, 5)(float64, float64)', nopython=True)
+def geocentric_position(unixtime, delta_t):
+    """Calculate the location independent part of the solar position.
+
+    Returns the apparent sidereal time, geocentric sun right ascension,
+    geocentric sun declination, equatorial horizontal parallax and
+    equation of time. None of these depend on the observer, so they
+    can be shared between any number of sites.
+    """
+    jd = julian_day(unixtime)
+    jde = julian_ephemeris_day(jd, delta_t)
+    jc = julian_century(jd)
+    jce = julian_ephemeris_century(jde)
+    jme = julian_ephemeris_millennium(jce)
+    L = heliocentric_longitude(jme)
+    B = heliocentric_latitude(jme)
+    R = heliocentric_radius_vector(jme)
+    x0 = mean_elongation(jce)
+    x1 = mean_anomaly_sun(jce)
+    x2 = mean_anomaly_moon(jce)
+    x3 = moon_argument_latitude(jce)
+    x4 = moon_ascending_longitude(jce)
+    delta_psi = longitude_nutation(jce, x0, x1, x2, x3, x4)
+    delta_epsilon = obliquity_nutation(jce, x0, x1, x2, x3, x4)
+    return geocentric_terms(jd, jc, jme, L, B, R, delta_psi, delta_epsilon)
+
+
+def geocentric_position_numpy(unixtime, delta_t, chunksize=None, eot=True,
+                              tolerance=None):
+    """Same as geocentric_position, but the periodic terms are evaluated
+    as blocked matrix products instead of looping over the table rows.
+    The equation of time is None if eot is False. If tolerance is not
+    None, the series are truncated with truncated_series(tolerance).
+    Will not work if the solar position functions were compiled with numba.
+    """
+    if tolerance is None:
+        series = {'L': HELIO_LONG_SERIES, 'R': HELIO_RADIUS_SERIES,
+                  'delta_psi': NUTATION_LONGITUDE_SERIES,
+                  'delta_epsilon': NUTATION_OBLIQUITY_SERIES}
+    else:
+        series = truncated_series(tolerance)
+    unixtime = np.asarray(unixtime, dtype=np.float64)
+    jd = julian_day(unixtime)
+    jde = julian_ephemeris_day(jd, delta_t)
+    jc = julian_century(jd)
+    jce = julian_ephemeris_century(jde)
+    jme = julian_ephemeris_millennium(jce)
+    L = heliocentric_longitude_batched(jme, chunksize, series['L'])
+    B = heliocentric_latitude_batched(jme, chunksize)
+    R = heliocentric_radius_vector_batched(jme, chunksize, series['R'])
+    x0 = mean_elongation(jce)
+    x1 = mean_anomaly_sun(jce)
+    x2 = mean_anomaly_moon(jce)
+    x3 = moon_argument_latitude(jce)
+    x4 = moon_ascending_longitude(jce)
+    delta_psi = longitude_nutation_batched(jce, x0, x1, x2, x3, x4, chunksize,
+                                           series['delta_psi'])
+    delta_epsilon = obliquity_nutation_batched(jce, x0, x1, x2, x3, x4,
+                                               chunksize,
+                                               series['delta_epsilon'])
+    if eot:
+        return geocentric_terms(jd, jc, jme, L, B, R, delta_psi,
+                                delta_epsilon)
+    v, alpha, delta, xi, epsilon = geocentric_sun_position(
+        jd, jc, jme, L, B, R, delta_psi, delta_epsilon)
+    return v, alpha, delta, xi, None
+
+
+@jcompile('float64(float64[:,:], float64[:], float64[:,:], boolean, float64, '
+          'float64, float64, float64, float64, float64)', nopython=True)
+def periodic_series(coeffs, phases, freqs, use_cos, t, x0, x1, x2, x3, x4):
+    """Scalar equivalent of _horner(_sum_periodic_terms(...), t) for a
+    series in the form of HELIO_LONG_SERIES. The heliocentric series
+    have one variable, x0, and the nutation series have five."""
+    result = 0.0
+    for i in range(freqs.shape[0]):
+        arg = phases[i] + freqs[i, 0] * x0
+        if freqs.shape[1] > 1:
+            arg += (freqs[i, 1] * x1 + freqs[i, 2] * x2 + freqs[i, 3] * x3 +
+                    freqs[i, 4] * x4)
+        if use_cos:
+            value = np.cos(arg)
+        else:
+            value = np.sin(arg)
+        coeff = coeffs[coeffs.shape[0] - 1, i]
+        for k in range(coeffs.shape[0] - 2, -1, -1):
+            coeff = coeff * t + coeffs[k, i]
+        result += coeff * value
+    return result
+
+
+@jcompile('UniTuple(float64, 5)(float64, float64, float64[:,:], float64[:], '
+          'float64[:,:], float64[:,:], float64[:], float64[:,:], '
+          'float64[:,:], float64[:], float64[:,:], float64[:,:], '
+          'float64[:], float64[:,:])', nopython=True)
+def geocentric_position_series(unixtime, delta_t, lc, lp, lf, rc, rp, rf,
+                               pc, pp, pf, ec, ep, ef):
+    """Same as geocentric_position, but with the heliocentric longitude,
+    radius vector and nutation series given as the (coefficients,
+    phases, frequencies) arrays of truncated_series"""
+    jd = julian_day(unixtime)
+    jde = julian_ephemeris_day(jd, delta_t)
+    jc = julian_century(jd)
+    jce = julian_ephemeris_century(jde)
+    jme = julian_ephemeris_millennium(jce)
+    L = np.rad2deg(periodic_series(lc, lp, lf, True, jme, jme, 0., 0., 0.,
+                                   0.) / 10**8) % 360
+    B = heliocentric_latitude(jme)
+    R = periodic_series(rc, rp, rf, True, jme, jme, 0., 0., 0., 0.) / 10**8
+    x0 = mean_elongation(jce)
+    x1 = mean_anomaly_sun(jce)
+    x2 = mean_anomaly_moon(jce)
+    x3 = moon_argument_latitude(jce)
+    x4 = moon_ascending_longitude(jce)
+    delta_psi = periodic_series(pc, pp, pf, False, jce, x0, x1, x2, x3,
+                                x4) / 36000000
+    delta_epsilon = periodic_series(ec, ep, ef, True, jce, x0, x1, x2, x3,
+                                    x4) / 36000000
+    return geocentric_terms(jd, jc, jme, L, B, R, delta_psi, delta_epsilon)
+
+
+@jcompile('UniTuple(float64, 3)(float64, float64, float64, float64, float64, '
+          'float64, float64)', nopython=True)
+def topocentric_sun_position(v, alpha, delta, xi, lat, lon, elev):
+    """Calculate the topocentric elevation angle without atmospheric
+    refraction, the topocentric sun declination and the topocentric
+    local hour angle from the output of geocentric_position"""
+    H = local_hour_angle(v, lon, alpha)
+    u = uterm(lat)
+    x = xterm(u, lat, elev)
+    y = yterm(u, lat, elev)
+    delta_alpha = parallax_sun_right_ascension(x, xi, H, delta)
+    delta_prime = topocentric_sun_declination(delta, x, y, xi, delta_alpha, H)
+    H_prime = topocentric_local_hour_angle(H, delta_alpha)
+    e0 = topocentric_elevation_angle_without_atmosphere(lat, delta_prime,
+                                                        H_prime)
+    return e0, delta_prime, H_prime
+
+
+@jcompile('UniTuple(float64, 5)(float64, float64, float64, float64, float64, '
+          'float64, float64, float64, float64, float64)', nopython=True)
+def topocentric_position(v, alpha, delta, xi, lat, lon, elev, pressure, temp,
+                         atmos_refract):
+    """Calculate the observer dependent part of the solar position from
+    the output of geocentric_position.
+
+    Returns the apparent zenith, zenith, apparent elevation, elevation
+    and azimuth.
+    """
+    e0, delta_prime, H_prime = topocentric_sun_position(v, alpha, delta, xi,
+                                                        lat, lon, elev)
+    delta_e = atmospheric_refraction_correction(pressure, temp, e0,
+                                                atmos_refract)
+    e = topocentric_elevation_angle(e0, delta_e)
+    theta = topocentric_zenith_angle(e)
+    theta0 = topocentric_zenith_angle(e0)
+    gamma = topocentric_astronomers_azimuth(H_prime, delta_prime, lat)
+    phi = topocentric_azimuth_angle(gamma)
+    return theta, theta0, e, e0, phi
+
+
+def topocentric_position_outputs(v, alpha, delta, xi, lat, lon, elev,
+                                 pressure, temp, atmos_refract, outputs):
+    """Same as topocentric_position, but only calculates the outputs
+    named in outputs and returns them in a dict. Will not work if the
+    solar position functions were compiled with numba.
+    """
+    result = {}
+    if not set(outputs).intersection(SOLAR_POSITION_OUTPUTS[:5]):
+        return result
+    e0, delta_prime, H_prime = topocentric_sun_position(v, alpha, delta, xi,
+                                                        lat, lon, elev)
+    if 'elevation' in outputs:
+        result['elevation'] = e0
+    if 'zenith' in outputs:
+        result['zenith'] = topocentric_zenith_angle(e0)
+    if 'apparent_elevation' in outputs or 'apparent_zenith' in outputs:
+        delta_e = atmospheric_refraction_correction(pressure, temp, e0,
+                                                    atmos_refract)
+        e = topocentric_elevation_angle(e0, delta_e)
+        result['apparent_elevation'] = e
+        result['apparent_zenith'] = topocentric_zenith_angle(e)
+    if 'azimuth' in outputs:
+        gamma = topocentric_astronomers_azimuth(H_prime, delta_prime, lat)
+        result['azimuth'] = topocentric_azimuth_angle(gamma)
+    return result
+
+
 @jcompile('void(float64[:], float64[:], float64[:,:])', nopython=True,
           nogil=True)
 def solar_position_loop(unixtime, loc_args, out):
@@ -909,58 +1411,15 @@ def solar_position_loop(unixtime, loc_args, out):
     sst = loc_args[7]
 
     for i in range(unixtime.shape[0]):
-        utime = unixtime[i]
-        jd = julian_day(utime)
-        jde = julian_ephemeris_day(jd, delta_t)
-        jc = julian_century(jd)
-        jce = julian_ephemeris_century(jde)
-        jme = julian_ephemeris_millennium(jce)
-        L = heliocentric_longitude(jme)
-        B = heliocentric_latitude(jme)
-        R = heliocentric_radius_vector(jme)
-        Theta = geocentric_longitude(L)
-        beta = geocentric_latitude(B)
-        x0 = mean_elongation(jce)
-        x1 = mean_anomaly_sun(jce)
-        x2 = mean_anomaly_moon(jce)
-        x3 = moon_argument_latitude(jce)
-        x4 = moon_ascending_longitude(jce)
-        delta_psi = longitude_nutation(jce, x0, x1, x2, x3, x4)
-        delta_epsilon = obliquity_nutation(jce, x0, x1, x2, x3, x4)
-        epsilon0 = mean_ecliptic_obliquity(jme)
-        epsilon = true_ecliptic_obliquity(epsilon0, delta_epsilon)
-        delta_tau = aberration_correction(R)
-        lamd = apparent_sun_longitude(Theta, delta_psi, delta_tau)
-        v0 = mean_sidereal_time(jd, jc)
-        v = apparent_sidereal_time(v0, delta_psi, epsilon)
-        alpha = geocentric_sun_right_ascension(lamd, epsilon, beta)
-        delta = geocentric_sun_declination(lamd, epsilon, beta)
+        v, alpha, delta, xi, eot = geocentric_position(unixtime[i], delta_t)
         if sst:
             out[0, i] = v
             out[1, i] = alpha
             out[2, i] = delta
             continue
-        m = sun_mean_longitude(jme)
-        eot = equation_of_time(m, alpha, delta_psi, epsilon)
-        H = local_hour_angle(v, lon, alpha)
-        xi = equatorial_horizontal_parallax(R)
-        u = uterm(lat)
-        x = xterm(u, lat, elev)
-        y = yterm(u, lat, elev)
-        delta_alpha = parallax_sun_right_ascension(x, xi, H, delta)
-        alpha_prime = topocentric_sun_right_ascension(alpha, delta_alpha)
-        delta_prime = topocentric_sun_declination(delta, x, y, xi, delta_alpha,
-                                                  H)
-        H_prime = topocentric_local_hour_angle(H, delta_alpha)
-        e0 = topocentric_elevation_angle_without_atmosphere(lat, delta_prime,
-                                                            H_prime)
-        delta_e = atmospheric_refraction_correction(pressure, temp, e0,
-                                                    atmos_refract)
-        e = topocentric_elevation_angle(e0, delta_e)
-        theta = topocentric_zenith_angle(e)
-        theta0 = topocentric_zenith_angle(e0)
-        gamma = topocentric_astronomers_azimuth(H_prime, delta_prime, lat)
-        phi = topocentric_azimuth_angle(gamma)
+        theta, theta0, e, e0, phi = topocentric_position(
+            v, alpha, delta, xi, lat, lon, elev, pressure, temp,
+            atmos_refract)
         out[0, i] = theta
         out[1, i] = theta0
         out[2, i] = e
@@ -969,101 +1428,337 @@ def solar_position_loop(unixtime, loc_args, out):
         out[5, i] = eot
 
 
-def solar_position_numba(unixtime, lat, lon, elev, pressure, temp, delta_t,
-                         atmos_refract, numthreads, sst=False):
-    """Calculate the solar position using the numba compiled functions
-    and multiple threads. Very slow if functions are not numba compiled.
+@jcompile('void(float64[:], float64, float64[:,:])', nopython=True,
+          nogil=True)
+def geocentric_position_loop(unixtime, delta_t, out):
+    """Loop through the time array and calculate the location independent
+    terms, one row of out per output of geocentric_position"""
+    for i in range(unixtime.shape[0]):
+        v, alpha, delta, xi, eot = geocentric_position(unixtime[i], delta_t)
+        out[0, i] = v
+        out[1, i] = alpha
+        out[2, i] = delta
+        out[3, i] = xi
+        out[4, i] = eot
+
+
+@jcompile('void(float64[:,:], float64[:,:], float64, float64[:,:,:])',
+          nopython=True, nogil=True)
+def topocentric_position_loop(geo, site_args, atmos_refract, out):
+    """Loop through the sites and the geocentric terms from
+    geocentric_position_loop and fill the (6, sites, times) out array"""
+    for j in range(site_args.shape[0]):
+        lat = site_args[j, 0]
+        lon = site_args[j, 1]
+        elev = site_args[j, 2]
+        pressure = site_args[j, 3]
+        temp = site_args[j, 4]
+        for i in range(geo.shape[1]):
+            theta, theta0, e, e0, phi = topocentric_position(
+                geo[0, i], geo[1, i], geo[2, i], geo[3, i], lat, lon, elev,
+                pressure, temp, atmos_refract)
+            out[0, j, i] = theta
+            out[1, j, i] = theta0
+            out[2, j, i] = e
+            out[3, j, i] = e0
+            out[4, j, i] = phi
+            out[5, j, i] = geo[4, i]
+
+
+@jcompile('void(float64[:], float64, float64[:,:], float64[:], float64[:,:], '
+          'float64[:,:], float64[:], float64[:,:], float64[:,:], float64[:], '
+          'float64[:,:], float64[:,:], float64[:], float64[:,:], '
+          'float64[:,:])', nopython=True, nogil=True)
+def geocentric_position_series_loop(unixtime, delta_t, lc, lp, lf, rc, rp, rf,
+                                    pc, pp, pf, ec, ep, ef, out):
+    """Same as geocentric_position_loop, but with the series arguments of
+    geocentric_position_series"""
+    for i in range(unixtime.shape[0]):
+        v, alpha, delta, xi, eot = geocentric_position_series(
+            unixtime[i], delta_t, lc, lp, lf, rc, rp, rf, pc, pp, pf, ec, ep,
+            ef)
+        out[0, i] = v
+        out[1, i] = alpha
+        out[2, i] = delta
+        out[3, i] = xi
+        out[4, i] = eot
+
+
+@jcompile('void(float64[:], float64, float64[:,:], float64[:], float64[:,:], '
+          'float64[:,:], float64[:], float64[:,:], float64[:,:], float64[:], '
+          'float64[:,:], float64[:,:], float64[:], float64[:,:], '
+          'float64[:,:], int64)', nopython=True, nogil=True, parallel=True)
+def geocentric_position_series_loop_parallel(unixtime, delta_t, lc, lp, lf,
+                                             rc, rp, rf, pc, pp, pf, ec, ep,
+                                             ef, out, chunksize):
+    """Split the time array into chunks of chunksize and run
+    geocentric_position_series_loop on the chunks in parallel"""
+    length = unixtime.shape[0]
+    nchunks = (length + chunksize - 1) // chunksize
+    for chunk in prange(nchunks):
+        start = chunk * chunksize
+        stop = min(start + chunksize, length)
+        geocentric_position_series_loop(
+            unixtime[start:stop], delta_t, lc, lp, lf, rc, rp, rf, pc, pp, pf,
+            ec, ep, ef, out[:, start:stop])
+
+
+def geocentric_position_truncated(unixtime, delta_t, tolerance, numthreads=8):
+    """Calculate the output of geocentric_position for an array of times
+    as a (5, times) array with the series truncated by
+    truncated_series(tolerance), using either the numba or numpy
+    functions."""
+    unixtime = np.asarray(unixtime, dtype=np.float64)
+    if not USE_NUMBA:
+        return np.array(geocentric_position_numpy(unixtime, delta_t,
+                                                  tolerance=tolerance))
+    series = truncated_series(tolerance)
+    args = (series['L'] + series['R'] + series['delta_psi'] +
+            series['delta_epsilon'])
+    geo = np.empty((5, unixtime.shape[0]), dtype=np.float64)
+    mode, chunksize = parallel_chunksize(unixtime.shape[0], numthreads,
+                                         PARALLEL_MIN_CHUNKSIZE)
+    if mode == 'parallel' and not _PARALLEL_LOCK.acquire(False):
+        mode = 'serial'
+    if mode == 'serial':
+        geocentric_position_series_loop(unixtime, delta_t, *(args + (geo, )))
+        return geo
+    try:
+        geocentric_position_series_loop_parallel(
+            unixtime, delta_t, *(args + (geo, chunksize)))
+    finally:
+        _PARALLEL_LOCK.release()
+    return geo
+
+
+def geocentric_position_array(unixtime, delta_t):
+    """Calculate the output of geocentric_position for an array of times
+    as a (5, times) array using either the numba or numpy functions."""
+    unixtime = np.asarray(unixtime, dtype=np.float64)
+    if not USE_NUMBA:
+        return np.array(geocentric_position_numpy(unixtime, delta_t))
+    geo = np.empty((5, unixtime.shape[0]), dtype=np.float64)
+    geocentric_position_loop(unixtime, delta_t, geo)
+    return geo
+
+
+@jcompile('void(float64[:], float64[:], float64[:,:], int64)', nopython=True,
+          nogil=True, parallel=True)
+def solar_position_loop_parallel(unixtime, loc_args, out, chunksize):
+    """Split the time array into chunks of chunksize and run
+    solar_position_loop on the chunks in parallel"""
+    length = unixtime.shape[0]
+    nchunks = (length + chunksize - 1) // chunksize
+    for chunk in prange(nchunks):
+        start = chunk * chunksize
+        stop = min(start + chunksize, length)
+        solar_position_loop(unixtime[start:stop], loc_args,
+                            out[:, start:stop])
+
+
+@jcompile('void(float64[:,:], float64[:,:], float64, float64[:,:,:], int64)',
+          nopython=True, nogil=True, parallel=True)
+def topocentric_position_loop_parallel(geo, site_args, atmos_refract, out,
+                                       chunksize):
+    """Split the sites into chunks of chunksize and run
+    topocentric_position_loop on the chunks in parallel"""
+    nsites = site_args.shape[0]
+    nchunks = (nsites + chunksize - 1) // chunksize
+    for chunk in prange(nchunks):
+        start = chunk * chunksize
+        stop = min(start + chunksize, nsites)
+        topocentric_position_loop(geo, site_args[start:stop], atmos_refract,
+                                  out[:, start:stop])
+
+
+@jcompile('void(float64[:], float64[:,:], float64, float64, float64[:,:])',
+          nopython=True, nogil=True)
+def solar_position_track_loop(unixtime, track_args, delta_t, atmos_refract,
+                              out):
+    """Loop through the time array and calculate the solar position for
+    an observer whose latitude, longitude, elevation, pressure and
+    temperature are the rows of the (5, times) track_args array"""
+    for i in range(unixtime.shape[0]):
+        v, alpha, delta, xi, eot = geocentric_position(unixtime[i], delta_t)
+        theta, theta0, e, e0, phi = topocentric_position(
+            v, alpha, delta, xi, track_args[0, i], track_args[1, i],
+            track_args[2, i], track_args[3, i], track_args[4, i],
+            atmos_refract)
+        out[0, i] = theta
+        out[1, i] = theta0
+        out[2, i] = e
+        out[3, i] = e0
+        out[4, i] = phi
+        out[5, i] = eot
+
+
+@jcompile('void(float64[:], float64[:,:], float64, float64, float64[:,:], '
+          'int64)', nopython=True, nogil=True, parallel=True)
+def solar_position_track_loop_parallel(unixtime, track_args, delta_t,
+                                       atmos_refract, out, chunksize):
+    """Split the time array into chunks of chunksize and run
+    solar_position_track_loop on the chunks in parallel"""
+    length = unixtime.shape[0]
+    nchunks = (length + chunksize - 1) // chunksize
+    for chunk in prange(nchunks):
+        start = chunk * chunksize
+        stop = min(start + chunksize, length)
+        solar_position_track_loop(unixtime[start:stop],
+                                  track_args[:, start:stop], delta_t,
+                                  atmos_refract, out[:, start:stop])
+
+
+@jcompile('void(float64[:,:], float64[:,:], float64, float64[:,:])',
+          nopython=True, nogil=True)
+def topocentric_position_track_loop(geo, track_args, atmos_refract, out):
+    """Same as solar_position_track_loop, but with the geocentric terms
+    given as the (5, times) output of geocentric_position_array"""
+    for i in range(geo.shape[1]):
+        theta, theta0, e, e0, phi = topocentric_position(
+            geo[0, i], geo[1, i], geo[2, i], geo[3, i], track_args[0, i],
+            track_args[1, i], track_args[2, i], track_args[3, i],
+            track_args[4, i], atmos_refract)
+        out[0, i] = theta
+        out[1, i] = theta0
+        out[2, i] = e
+        out[3, i] = e0
+        out[4, i] = phi
+        out[5, i] = geo[4, i]
+
+
+def track_args_array(length, lat, lon, elev, pressure, temp):
+    """Return the observer arguments as a (5, length) array if any of them
+    is an array, e.g. for a moving observer, or None if all are scalars."""
+    args = [np.asarray(arg, dtype=np.float64)
+            for arg in (lat, lon, elev, pressure, temp)]
+    if all(arg.ndim == 0 for arg in args):
+        return None
+    track_args = np.empty((5, length), dtype=np.float64)
+    for i, arg in enumerate(args):
+        track_args[i] = arg.ravel()
+    return track_args
+
+
+def parallel_chunksize(length, numthreads, min_chunksize=1):
     """
-    loc_args = np.array([lat, lon, elev, pressure, temp, delta_t,
-                         atmos_refract, sst])
-    ulength = unixtime.shape[0]
-    result = np.empty((6, ulength), dtype=np.float64)
-    if unixtime.dtype != np.float64:
-        unixtime = unixtime.astype(np.float64)
+    Choose how to split a compiled loop over length elements.
 
-    if ulength < numthreads:
-        pvl_logger.warning('The number of threads is more than the length of' +
-                           ' the time array. Only using %s threads.',
-                            ulength)
-        numthreads = ulength
+    Parameters
+    ----------
+    length : int
+        Number of elements in the loop
+    numthreads : int
+        Maximum number of threads to use, also limited by the number
+        of threads available to numba.
+    min_chunksize : int, optional
+        Minimum number of elements in each chunk.
 
+    Returns
+    -------
+    tuple : (mode, chunksize) where mode is 'serial' if the loop
+    should run in the calling thread or 'parallel' otherwise.
+    """
+    numthreads = min(numthreads, NUM_CORES, length // max(min_chunksize, 1))
     if numthreads <= 1:
-        pvl_logger.debug('Only using one thread for calculation')
-        solar_position_loop(unixtime, loc_args, result)
+        return 'serial', length
+    return 'parallel', -(-length // numthreads)
+
+
+def solar_position_numba(unixtime, lat, lon, elev, pressure, temp, delta_t,
+                         atmos_refract, numthreads, sst=False, outputs=None,
+                         tolerance=None):
+    """Calculate the solar position using the numba compiled functions
+    and multiple threads. Very slow if functions are not numba compiled.
+    All of the outputs are calculated, and the rows named in outputs are
+    returned if outputs is not None.
+    """
+    if tolerance is not None:
+        geo = geocentric_position_truncated(unixtime, delta_t, tolerance,
+                                            numthreads)
+        if sst:
+            return geo[:3]
+        result = solar_position_geo(geo, lat, lon, elev, pressure, temp,
+                                    atmos_refract)
+        if outputs is not None:
+            result = result[[SOLAR_POSITION_OUTPUTS.index(name)
+                             for name in outputs]]
         return result
 
-    split0 = np.array_split(unixtime, numthreads)
-    split2 = np.array_split(result, numthreads, axis=1)
-    chunks = [[a0, loc_args, split2[i]] for i, a0 in enumerate(split0)]
-    # Spawn one thread per chunk
-    threads = [threading.Thread(target=solar_position_loop, args=chunk)
-               for chunk in chunks]
-    for thread in threads:
-        thread.start()
-    for thread in threads:
-        thread.join()
+    ulength = unixtime.shape[0]
+    result = np.empty((6, ulength), dtype=np.float64)
+    unixtime = np.asarray(unixtime, dtype=np.float64)
+    track_args = None
+    if not sst:
+        track_args = track_args_array(ulength, lat, lon, elev, pressure,
+                                      temp)
+    if track_args is None:
+        loc_args = np.array([lat, lon, elev, pressure, temp, delta_t,
+                             atmos_refract, sst])
+
+    mode, chunksize = parallel_chunksize(ulength, numthreads,
+                                         PARALLEL_MIN_CHUNKSIZE)
+    if mode == 'parallel' and not _PARALLEL_LOCK.acquire(False):
+        mode, chunksize = 'serial', ulength
+    pvl_logger.debug('Calculating solar position in %s mode with chunksize %s',
+                     mode, chunksize)
+    if mode == 'serial':
+        if track_args is None:
+            solar_position_loop(unixtime, loc_args, result)
+        else:
+            solar_position_track_loop(unixtime, track_args, delta_t,
+                                      atmos_refract, result)
+    else:
+        try:
+            if track_args is None:
+                solar_position_loop_parallel(unixtime, loc_args, result,
+                                             chunksize)
+            else:
+                solar_position_track_loop_parallel(
+                    unixtime, track_args, delta_t, atmos_refract, result,
+                    chunksize)
+        finally:
+            _PARALLEL_LOCK.release()
+    if outputs is not None and not sst:
+        result = result[[SOLAR_POSITION_OUTPUTS.index(name)
+                         for name in outputs]]
     return result
 
 
 def solar_position_numpy(unixtime, lat, lon, elev, pressure, temp, delta_t,
-                         atmos_refract, numthreads, sst=False):
+                         atmos_refract, numthreads, sst=False, outputs=None,
+                         tolerance=None):
     """Calculate the solar position assuming unixtime is a numpy array. Note
     this function will not work if the solar position functions were
-    compiled with numba.
+    compiled with numba. If outputs is not None, only the named outputs
+    and the terms they depend on are calculated.
     """
-
-    jd = julian_day(unixtime)
-    jde = julian_ephemeris_day(jd, delta_t)
-    jc = julian_century(jd)
-    jce = julian_ephemeris_century(jde)
-    jme = julian_ephemeris_millennium(jce)
-    L = heliocentric_longitude(jme)
-    B = heliocentric_latitude(jme)
-    R = heliocentric_radius_vector(jme)
-    Theta = geocentric_longitude(L)
-    beta = geocentric_latitude(B)
-    x0 = mean_elongation(jce)
-    x1 = mean_anomaly_sun(jce)
-    x2 = mean_anomaly_moon(jce)
-    x3 = moon_argument_latitude(jce)
-    x4 = moon_ascending_longitude(jce)
-    delta_psi = longitude_nutation(jce, x0, x1, x2, x3, x4)
-    delta_epsilon = obliquity_nutation(jce, x0, x1, x2, x3, x4)
-    epsilon0 = mean_ecliptic_obliquity(jme)
-    epsilon = true_ecliptic_obliquity(epsilon0, delta_epsilon)
-    delta_tau = aberration_correction(R)
-    lamd = apparent_sun_longitude(Theta, delta_psi, delta_tau)
-    v0 = mean_sidereal_time(jd, jc)
-    v = apparent_sidereal_time(v0, delta_psi, epsilon)
-    alpha = geocentric_sun_right_ascension(lamd, epsilon, beta)
-    delta = geocentric_sun_declination(lamd, epsilon, beta)
     if sst:
+        v, alpha, delta, xi, eot = geocentric_position_numpy(
+            unixtime, delta_t, tolerance=tolerance)
         return v, alpha, delta
-    m = sun_mean_longitude(jme)
-    eot = equation_of_time(m, alpha, delta_psi, epsilon)
-    H = local_hour_angle(v, lon, alpha)
-    xi = equatorial_horizontal_parallax(R)
-    u = uterm(lat)
-    x = xterm(u, lat, elev)
-    y = yterm(u, lat, elev)
-    delta_alpha = parallax_sun_right_ascension(x, xi, H, delta)
-    alpha_prime = topocentric_sun_right_ascension(alpha, delta_alpha)
-    delta_prime = topocentric_sun_declination(delta, x, y, xi, delta_alpha, H)
-    H_prime = topocentric_local_hour_angle(H, delta_alpha)
-    e0 = topocentric_elevation_angle_without_atmosphere(lat, delta_prime,
-                                                        H_prime)
-    delta_e = atmospheric_refraction_correction(pressure, temp, e0,
-                                                atmos_refract)
-    e = topocentric_elevation_angle(e0, delta_e)
-    theta = topocentric_zenith_angle(e)
-    theta0 = topocentric_zenith_angle(e0)
-    gamma = topocentric_astronomers_azimuth(H_prime, delta_prime, lat)
-    phi = topocentric_azimuth_angle(gamma)
-    return theta, theta0, e, e0, phi, eot
+    if outputs is None:
+        outputs = SOLAR_POSITION_OUTPUTS
+    lat, lon, elev, pressure, temp = [
+        np.asarray(arg, dtype=np.float64)
+        for arg in (lat, lon, elev, pressure, temp)]
+    v, alpha, delta, xi, eot = geocentric_position_numpy(
+        unixtime, delta_t, eot='equation_of_time' in outputs,
+        tolerance=tolerance)
+    result = topocentric_position_outputs(
+        v, alpha, delta, xi, lat, lon, elev, pressure, temp, atmos_refract,
+        outputs)
+    result['equation_of_time'] = eot
+    return tuple(result[name] for name in outputs)
+
+
+# names of the outputs of solar_position, in order
+SOLAR_POSITION_OUTPUTS = ('apparent_zenith', 'zenith', 'apparent_elevation',
+                          'elevation', 'azimuth', 'equation_of_time')
 
 
 def solar_position(unixtime, lat, lon, elev, pressure, temp, delta_t,
-                   atmos_refract, numthreads=8, sst=False):
+                   atmos_refract, numthreads=8, sst=False, outputs=None,
+                   tolerance=None):
 
     """
     Calculate the solar position using the
@@ -1079,16 +1774,16 @@ def solar_position(unixtime, lat, lon, elev, pressure, temp, delta_t,
         Array of unix/epoch timestamps to calculate solar position for.
         Unixtime is the number of seconds since Jan. 1, 1970 00:00:00 UTC.
         A pandas.DatetimeIndex is easily converted using .astype(np.int64)/10**9
-    lat : float
+    lat : float or numpy array
         Latitude to calculate solar position for
-    lon : float
+    lon : float or numpy array
         Longitude to calculate solar position for
-    elev : float
+    elev : float or numpy array
         Elevation of location in meters
-    pressure : int or float
+    pressure : int, float or numpy array
         avg. yearly pressure at location in Pascals;
         used for atmospheric correction
-    temp : int or float
+    temp : int, float or numpy array
         avg. yearly temperature at location in
         degrees C; used for atmospheric correction
     delta_t : float, optional
@@ -1098,18 +1793,35 @@ def solar_position(unixtime, lat, lon, elev, pressure, temp, delta_t,
         The approximate atmospheric refraction (in degrees)
         at sunrise and sunset.
     numthreads: int, optional
-        Number of threads to use for computation if numba>=0.17
+        Number of threads to use for computation if numba>=0.34
         is installed.
+    outputs: list of str, optional
+        Names from SOLAR_POSITION_OUTPUTS of the outputs to return,
+        in the order given. If numba is not used, outputs that are not
+        needed are not calculated, e.g. the atmospheric refraction
+        correction is skipped if no apparent angle is requested.
+    tolerance: float, optional
+        Maximum error in degrees of the geocentric sun position allowed
+        for dropping the smallest periodic terms of the heliocentric
+        longitude, radius vector and nutation, see
+        :func:`truncated_series`. The bound holds for 1900-2100. By
+        default, the full tables are used.
 
     Returns
     -------
     Numpy Array with elements:
         apparent zenith,
         zenith,
-        elevation,
         apparent_elevation,
+        elevation,
         azimuth,
         equation_of_time
+    or the elements named in outputs.
+
+    Notes
+    -----
+    Any of lat, lon, elev, pressure and temp may be an array with the
+    same length as unixtime, e.g. for an observer on a moving vehicle.
 
     References
     ----------
@@ -1119,6 +1831,15 @@ def solar_position(unixtime, lat, lon, elev, pressure, temp, delta_t,
     [2] I. Reda and A. Andreas, Corrigendum to Solar position algorithm for
     solar radiation applications. Solar Energy, vol. 81, no. 6, p. 838, 2007.
     """
+    if outputs is not None:
+        outputs = list(outputs)
+        if not outputs:
+            raise ValueError('No solar position outputs selected')
+        invalid = set(outputs).difference(SOLAR_POSITION_OUTPUTS)
+        if invalid:
+            raise ValueError('Invalid solar position outputs: %s' %
+                             ', '.join(sorted(invalid)))
+
     if USE_NUMBA:
         do_calc = solar_position_numba
     else:
@@ -1126,7 +1847,7 @@ def solar_position(unixtime, lat, lon, elev, pressure, temp, delta_t,
 
     result = do_calc(unixtime, lat, lon, elev, pressure,
                      temp, delta_t, atmos_refract, numthreads,
-                     sst)
+                     sst, outputs, tolerance)
 
     if not isinstance(result, np.ndarray):
         try:
@@ -1137,6 +1858,484 @@ def solar_position(unixtime, lat, lon, elev, pressure, temp, delta_t,
     return result
 
 
+def solar_position_multisite(unixtime, lats, lons, elevs, pressures, temps,
+                             delta_t, atmos_refract, numthreads=8):
+    """
+    Calculate the solar position at many sites for the same times.
+
+    The location independent terms of the NREL SPA algorithm
+    (heliocentric position, nutation, sidereal time, geocentric right
+    ascension and declination) are evaluated once for the time array and
+    only the topocentric terms are evaluated for each site.
+
+    Parameters
+    ----------
+    unixtime : numpy array
+        Array of unix/epoch timestamps to calculate solar position for.
+    lats : array-like
+        Latitude of each site
+    lons : array-like
+        Longitude of each site
+    elevs : array-like
+        Elevation of each site in meters
+    pressures : array-like or float
+        avg. yearly pressure at each site in millibars
+    temps : array-like or float
+        avg. yearly temperature at each site in degrees C
+    delta_t : float
+        Difference between terrestrial time and UT1.
+    atmos_refract : float
+        The approximate atmospheric refraction (in degrees)
+        at sunrise and sunset.
+    numthreads: int, optional
+        Number of threads to use for computation if numba>=0.34
+        is installed.
+
+    Returns
+    -------
+    Numpy Array with shape (6, number of sites, number of times) and
+    elements in the same order as :func:`solar_position`.
+    """
+    unixtime = np.asarray(unixtime, dtype=np.float64)
+    site_args = np.column_stack(np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(arg, dtype=np.float64))
+          for arg in (lats, lons, elevs, pressures, temps)]))
+
+    geo = geocentric_position_array(unixtime, delta_t)
+    result = np.empty((6, site_args.shape[0], unixtime.shape[0]),
+                      dtype=np.float64)
+    return topocentric_position_array(geo, site_args, atmos_refract,
+                                      numthreads, result)
+
+
+def topocentric_position_array(geo, site_args, atmos_refract, numthreads,
+                               result):
+    """Fill the (6, sites, times) result array with the solar position at
+    each site of the (sites, 5) array of latitude, longitude, elevation,
+    pressure and temperature from the (5, times) output of
+    geocentric_position_array, and return it."""
+    nsites = site_args.shape[0]
+    ulength = geo.shape[1]
+
+    if not USE_NUMBA:
+        col = [arg[:, np.newaxis] for arg in site_args.T]
+        topo = topocentric_position(geo[0], geo[1], geo[2], geo[3], col[0],
+                                    col[1], col[2], col[3], col[4],
+                                    atmos_refract)
+        for i, arr in enumerate(topo + (geo[4], )):
+            result[i] = arr
+        return result
+
+    # split the sites between the threads, the geocentric terms are shared
+    mode, chunksize = parallel_chunksize(
+        nsites, numthreads, -(-PARALLEL_MIN_CHUNKSIZE // max(ulength, 1)))
+    if mode == 'parallel' and not _PARALLEL_LOCK.acquire(False):
+        mode, chunksize = 'serial', nsites
+    pvl_logger.debug('Calculating topocentric terms for %s sites in %s mode '
+                     'with chunksize %s', nsites, mode, chunksize)
+    if mode == 'serial':
+        topocentric_position_loop(geo, site_args, atmos_refract, result)
+        return result
+    try:
+        topocentric_position_loop_parallel(geo, site_args, atmos_refract,
+                                           result, chunksize)
+    finally:
+        _PARALLEL_LOCK.release()
+    return result
+
+
+# default memory budget of solar_position_grid
+GRID_BLOCK_BYTES = 256*2**20
+# peak number of float64 values per pixel and time step that are alive while
+# the numpy implementation calculates a tile, including the tile buffer
+_GRID_TEMPORARIES = 18
+
+
+def solar_position_grid(unixtime, lats, lons, elevs=0., pressures=1013.25,
+                        temps=12., delta_t=67.0, atmos_refract=0.5667,
+                        numthreads=8, outputs=None, max_bytes=GRID_BLOCK_BYTES,
+                        out=None):
+    """
+    Calculate the solar position on a grid of latitudes and longitudes.
+
+    The location independent terms are calculated once for the times and
+    shared by all of the pixels. The pixels are processed in tiles that
+    are sized so that the temporary arrays use at most about max_bytes.
+
+    Parameters
+    ----------
+    unixtime : numpy array
+        Array of unix/epoch timestamps to calculate solar position for.
+    lats : array-like
+        1-D latitudes of the rows of the grid, or a 2-D array of the
+        latitude of each pixel.
+    lons : array-like
+        1-D longitudes of the columns of the grid, or a 2-D array of the
+        longitude of each pixel.
+    elevs : float or array-like, optional
+        Elevation of each pixel in meters, broadcast to the grid shape.
+    pressures : float or array-like, optional
+        avg. yearly pressure of each pixel in millibars.
+    temps : float or array-like, optional
+        avg. yearly temperature of each pixel in degrees C.
+    delta_t : float, optional
+        Difference between terrestrial time and UT1.
+    atmos_refract : float, optional
+        The approximate atmospheric refraction (in degrees)
+        at sunrise and sunset.
+    numthreads: int, optional
+        Number of threads to use for computation if numba>=0.34
+        is installed.
+    outputs: list of str, optional
+        Names from SOLAR_POSITION_OUTPUTS of the outputs to return.
+        Defaults to all of them.
+    max_bytes : int, optional
+        Memory budget for the temporary arrays of each tile. A tile is
+        at least one pixel.
+    out : numpy array, optional
+        Array with shape (outputs, times, y, x) to store the result in,
+        e.g. a numpy.memmap if the result does not fit in memory.
+
+    Returns
+    -------
+    Numpy Array with shape (outputs, times, y, x) and elements in the
+    order of outputs, or of :func:`solar_position` if outputs is None.
+    """
+    unixtime = np.atleast_1d(np.asarray(unixtime, dtype=np.float64))
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if lats.ndim == 1 and lons.ndim == 1:
+        lons, lats = np.meshgrid(lons, lats)
+    elif lats.shape != lons.shape or lats.ndim != 2:
+        raise ValueError('lats and lons must both be 1-D or have the same '
+                         '2-D shape')
+    shape = lats.shape
+    grid_args = [lats, lons] + [np.broadcast_to(np.asarray(arg, np.float64),
+                                                shape)
+                                for arg in (elevs, pressures, temps)]
+
+    if outputs is None:
+        rows = list(range(len(SOLAR_POSITION_OUTPUTS)))
+    else:
+        if len(outputs) == 0:
+            raise ValueError('No solar position outputs selected')
+        invalid = set(outputs).difference(SOLAR_POSITION_OUTPUTS)
+        if invalid:
+            raise ValueError('Invalid solar position outputs: %s' %
+                             ', '.join(sorted(invalid)))
+        rows = [SOLAR_POSITION_OUTPUTS.index(name) for name in outputs]
+
+    ntimes = unixtime.shape[0]
+    npixels = shape[0] * shape[1]
+    if out is None:
+        out = np.empty((len(rows), ntimes) + shape, dtype=np.float64)
+    elif out.shape != (len(rows), ntimes) + shape:
+        raise ValueError('out must have shape %s' %
+                         (((len(rows), ntimes) + shape), ))
+    flat_out = out.reshape(len(rows), ntimes, npixels)
+
+    values = 6 if USE_NUMBA else _GRID_TEMPORARIES
+    tilesize = int(max(1, min(npixels, max_bytes // (8 * values *
+                                                      max(ntimes, 1)))))
+    pvl_logger.debug('Calculating solar position for %s pixels in tiles of '
+                     '%s pixels', npixels, tilesize)
+
+    geo = geocentric_position_array(unixtime, delta_t)
+    flat_args = [arg.reshape(npixels) for arg in grid_args]
+    buf = np.empty((6, tilesize, ntimes), dtype=np.float64)
+    for start in range(0, npixels, tilesize):
+        stop = min(start + tilesize, npixels)
+        site_args = np.column_stack([arg[start:stop] for arg in flat_args])
+        tile = topocentric_position_array(geo, site_args, atmos_refract,
+                                          numthreads, buf[:, :stop - start])
+        for i, row in enumerate(rows):
+            flat_out[i, :, start:stop] = tile[row].T
+
+    return out
+
+
+# degree of the daily Chebyshev polynomials used by chebyshev_ephemeris
+CHEBYSHEV_DEGREE = 5
+
+
+def chebyshev_ephemeris(start_year, end_year, delta_t,
+                        degree=CHEBYSHEV_DEGREE):
+    """
+    Fit daily Chebyshev polynomials to the location independent
+    terms of the SPA algorithm (apparent sidereal time, geocentric
+    right ascension and declination, equatorial horizontal parallax and
+    equation of time) for the years start_year through end_year.
+
+    With the default degree, the maximum difference from
+    :func:`geocentric_position`, measured at 500000 random times of an
+    ephemeris of 2000-2029, is 2.0e-7 degrees for the sidereal time and
+    less than 1e-9 degrees (or minutes for the equation of time) for the
+    other terms, which is at the level of the floating point error of
+    the full calculation.
+
+    Parameters
+    ----------
+    start_year : int
+        First year covered by the ephemeris, starting at 00:00 UTC on Jan 1.
+    end_year : int
+        Last year covered by the ephemeris, ending at 00:00 UTC on Jan 1
+        of the following year.
+    delta_t : float
+        Difference between terrestrial time and UT1.
+    degree : int, optional
+        Degree of the Chebyshev polynomial for each day.
+
+    Returns
+    -------
+    dict with keys
+        start : unix time of the start of the first day
+        delta_t : delta_t used to fit the polynomials
+        coeffs : (5, days, degree + 1) array of Chebyshev coefficients
+    """
+    start = _unixtime_jan1(start_year)
+    ndays = int(round((_unixtime_jan1(end_year + 1) - start) / 86400))
+    nnodes = degree + 1
+    # Chebyshev nodes on [-1, 1] for each day
+    nodes = np.cos(np.pi * (np.arange(nnodes) + 0.5) / nnodes)
+    unixtime = start + 86400 * (np.arange(ndays)[:, np.newaxis] +
+                                (nodes + 1) / 2)
+    geo = geocentric_position_array(unixtime.ravel(), delta_t).reshape(
+        5, ndays, nnodes)
+    # sidereal time and right ascension are angles, so remove the
+    # jumps at 360 degrees before fitting
+    geo[:2] = np.degrees(np.unwrap(np.radians(geo[:2]), axis=2))
+    vander = np.polynomial.chebyshev.chebvander(nodes, degree)
+    coeffs = 2.0 / nnodes * np.dot(geo, vander)
+    coeffs[:, :, 0] /= 2
+    return {'start': start, 'delta_t': delta_t, 'coeffs': coeffs}
+
+
+def _unixtime_jan1(year):
+    """Unix time of 00:00 UTC on Jan 1 of year"""
+    return (np.datetime64('%04d-01-01' % year, 's') -
+            np.datetime64('1970-01-01', 's')).astype(np.float64)
+
+
+def save_chebyshev_ephemeris(path, ephemeris):
+    """Save the output of chebyshev_ephemeris to a compressed .npz file"""
+    np.savez_compressed(path, **ephemeris)
+
+
+def load_chebyshev_ephemeris(path):
+    """Load an ephemeris saved with save_chebyshev_ephemeris"""
+    with np.load(path) as data:
+        return {'start': float(data['start']),
+                'delta_t': float(data['delta_t']),
+                'coeffs': data['coeffs']}
+
+
+def geocentric_position_chebyshev(unixtime, ephemeris):
+    """
+    Evaluate the output of chebyshev_ephemeris at unixtime.
+
+    Returns the same apparent sidereal time, geocentric sun right ascension,
+    geocentric sun declination, equatorial horizontal parallax and
+    equation of time as geocentric_position.
+    """
+    coeffs = ephemeris['coeffs']
+    days = (np.asarray(unixtime, dtype=np.float64) - ephemeris['start']
+            ) / 86400
+    day = np.floor(days).astype(np.int64)
+    if day.size and (day.min() < 0 or day.max() >= coeffs.shape[1]):
+        raise ValueError('unixtime is outside of the range of the ephemeris')
+    x = 2 * (days - day) - 1
+    # Clenshaw recurrence, gathering one coefficient per day at a time
+    b1 = np.zeros((coeffs.shape[0], ) + x.shape)
+    b2 = np.zeros_like(b1)
+    for k in range(coeffs.shape[2] - 1, 0, -1):
+        b1, b2 = 2 * x * b1 - b2 + coeffs[:, day, k], b1
+    geo = x * b1 - b2 + coeffs[:, day, 0]
+    geo[:2] %= 360
+    return tuple(geo)
+
+
+def solar_position_chebyshev(unixtime, ephemeris, lat, lon, elev, pressure,
+                             temp, atmos_refract):
+    """
+    Calculate the solar position using the location independent terms
+    from a Chebyshev ephemeris, see :func:`chebyshev_ephemeris`.
+
+    Parameters are the same as :func:`solar_position` except
+    that delta_t is taken from the ephemeris.
+
+    Returns
+    -------
+    Numpy Array with the same elements as :func:`solar_position`.
+    """
+    unixtime = np.asarray(unixtime, dtype=np.float64)
+    geo = geocentric_position_chebyshev(unixtime, ephemeris)
+    return solar_position_geo(geo, lat, lon, elev, pressure, temp,
+                              atmos_refract)
+
+
+def solar_position_geo(geo, lat, lon, elev, pressure, temp, atmos_refract):
+    """Calculate the output of :func:`solar_position` from the location
+    independent terms, given as a sequence of 5 arrays in the order of
+    the output of geocentric_position."""
+    if not USE_NUMBA:
+        lat, lon, elev, pressure, temp = [
+            np.asarray(arg, dtype=np.float64)
+            for arg in (lat, lon, elev, pressure, temp)]
+        return np.array(topocentric_position(
+            geo[0], geo[1], geo[2], geo[3], lat, lon, elev, pressure, temp,
+            atmos_refract) + (geo[4], ))
+
+    geo = np.array(geo, dtype=np.float64)
+    length = geo.shape[1]
+    track_args = track_args_array(length, lat, lon, elev, pressure, temp)
+    if track_args is not None:
+        result = np.empty((6, length), dtype=np.float64)
+        topocentric_position_track_loop(geo, track_args, atmos_refract,
+                                        result)
+        return result
+
+    site_args = np.array([[lat, lon, elev, pressure, temp]], dtype=np.float64)
+    result = np.empty((6, 1, length), dtype=np.float64)
+    topocentric_position_loop(geo, site_args, atmos_refract, result)
+    return result[:, 0]
+
+
+# default spacing in seconds of the exactly calculated anchor times of
+# solar_position_interpolated
+INTERPOLATION_SPACING = 300.
+
+
+def geocentric_position_interpolated(unixtime, delta_t,
+                                     spacing=INTERPOLATION_SPACING):
+    """
+    Interpolate the location independent terms of the SPA algorithm
+    from exact values at anchor times that are multiples of spacing.
+
+    Each time is interpolated with the 4 point Lagrange polynomial
+    through the anchor times around it. The apparent sidereal time and
+    the right ascension are interpolated relative to the anchor before
+    the time so that the wrap at 360 degrees does not matter. Only the
+    anchors that are needed are calculated, so gaps in the times do not
+    cost anything.
+
+    For spacings up to 15 minutes, the maximum difference from
+    :func:`geocentric_position` is about 2e-7 degrees for the sidereal
+    time, which is the floating point error of the exact calculation,
+    and less than 1e-9 degrees for the other terms.
+
+    Parameters
+    ----------
+    unixtime : numpy array
+        Array of unix/epoch timestamps.
+    delta_t : float
+        Difference between terrestrial time and UT1.
+    spacing : float, optional
+        Seconds between the anchor times.
+
+    Returns
+    -------
+    tuple of 5 arrays in the order of the output of geocentric_position.
+    """
+    unixtime = np.asarray(unixtime, dtype=np.float64)
+    step = np.floor(unixtime / spacing)
+    u = unixtime / spacing - step
+    step = step.astype(np.int64)
+    anchors, inverse = np.unique(
+        np.concatenate([step - 1, step, step + 1, step + 2]),
+        return_inverse=True)
+    if anchors.shape[0] >= unixtime.shape[0]:
+        pvl_logger.debug('Fewer times than anchors, calculating the '
+                         'geocentric terms exactly')
+        return tuple(geocentric_position_array(unixtime, delta_t))
+
+    pvl_logger.debug('Interpolating the geocentric terms of %s times from '
+                     '%s anchors', unixtime.shape[0], anchors.shape[0])
+    geo = geocentric_position_array(anchors * spacing, delta_t)
+    # values at the 4 anchors of each time, shape (5, 4, times)
+    nodes = geo[:, inverse.reshape(4, -1)]
+    # the sidereal time and right ascension relative to the second anchor
+    nodes[:2] = (nodes[:2] - nodes[:2, 1:2] + 180) % 360 - 180
+    weights = np.array([-u * (u - 1) * (u - 2) / 6,
+                        (u + 1) * (u - 1) * (u - 2) / 2,
+                        -(u + 1) * u * (u - 2) / 2,
+                        (u + 1) * u * (u - 1) / 6])
+    result = np.einsum('ijk,jk->ik', nodes, weights)
+    result[:2] = (result[:2] + geo[:2, inverse[unixtime.shape[0]:
+                                               2 * unixtime.shape[0]]]) % 360
+    return tuple(result)
+
+
+def solar_position_interpolated(unixtime, lat, lon, elev, pressure, temp,
+                                delta_t, atmos_refract,
+                                spacing=INTERPOLATION_SPACING):
+    """
+    Calculate the solar position with the location independent terms
+    interpolated between anchor times, see
+    :func:`geocentric_position_interpolated`.
+
+    The topocentric terms, including the atmospheric refraction near
+    sunrise and sunset and the azimuth, are calculated exactly for
+    every time, so the errors are those of the interpolated terms.
+    Parameters are the same as :func:`solar_position`.
+
+    Returns
+    -------
+    Numpy Array with the same elements as :func:`solar_position`.
+    """
+    geo = geocentric_position_interpolated(unixtime, delta_t, spacing)
+    return solar_position_geo(geo, lat, lon, elev, pressure, temp,
+                               atmos_refract)
+
+
+@jcompile('void(float64[:], float64, float64[:])', nopython=True, nogil=True)
+def earthsun_distance_loop(unixtime, delta_t, out):
+    """Loop through the time array and calculate the heliocentric radius
+    vector"""
+    for i in range(unixtime.shape[0]):
+        jd = julian_day(unixtime[i])
+        jde = julian_ephemeris_day(jd, delta_t)
+        jce = julian_ephemeris_century(jde)
+        jme = julian_ephemeris_millennium(jce)
+        out[i] = heliocentric_radius_vector(jme)
+
+
+def earthsun_distance(unixtime, delta_t):
+    """
+    Calculate the distance between the earth and the sun using the
+    NREL SPA algorithm described in [1].
+
+    Parameters
+    ----------
+    unixtime : numpy array
+        Array of unix/epoch timestamps to calculate solar position for.
+        Unixtime is the number of seconds since Jan. 1, 1970 00:00:00 UTC.
+        A pandas.DatetimeIndex is easily converted using .astype(np.int64)/10**9
+    delta_t : float
+        Difference between terrestrial time and UT. USNO has tables.
+
+    Returns
+    -------
+    R : numpy array
+        Earth-Sun distance in AU.
+
+    References
+    ----------
+    [1] Reda, I., Andreas, A., 2003. Solar position algorithm for solar
+    radiation applications. Technical report: NREL/TP-560- 34302. Golden,
+    USA, http://www.nrel.gov.
+    """
+    unixtime = np.asarray(unixtime, dtype=np.float64)
+    if USE_NUMBA:
+        R = np.empty(unixtime.shape[0], dtype=np.float64)
+        earthsun_distance_loop(unixtime, delta_t, R)
+        return R
+    jd = julian_day(unixtime)
+    jde = julian_ephemeris_day(jd, delta_t)
+    jce = julian_ephemeris_century(jde)
+    jme = julian_ephemeris_millennium(jce)
+    return heliocentric_radius_vector_batched(jme)
+
+
 def transit_sunrise_sunset(dates, lat, lon, delta_t, numthreads):
     """
     Calculate the sun transit, sunrise, and sunset
@@ -1148,9 +2347,9 @@ def transit_sunrise_sunset(dates, lat, lon, delta_t, numthreads):
         Numpy array of ints/floats corresponding to the Unix time
         for the dates of interest, must be midnight UTC (00:00+00:00)
         on the day of interest.
-    lat : float
+    lat : float or array
         Latitude of location to perform calculation for
-    lon : float
+    lon : float or array
         Longitude of location
     delta_t : float
         Difference between terrestrial time and UT. USNO has tables.
@@ -1161,63 +2360,94 @@ def transit_sunrise_sunset(dates, lat, lon, delta_t, numthreads):
     -------
     tuple : (transit, sunrise, sunset) localized to UTC
 
+    Notes
+    -----
+    lat and lon may be arrays that broadcast against dates, e.g. of
+    shape (sites, 1), to calculate many locations at once. The location
+    independent terms are calculated once with
+    :func:`transit_sunrise_sunset_geocentric` and shared by all of the
+    locations.
+    """
+
+    geo = transit_sunrise_sunset_geocentric(dates, delta_t, numthreads)
+    return transit_sunrise_sunset_local(geo, lat, lon, delta_t)
+
+
+def transit_sunrise_sunset_geocentric(dates, delta_t, numthreads):
     """
+    Calculate the location independent terms of the sun transit, sunrise
+    and sunset with one call to solar_position.
 
+    Returns
+    -------
+    tuple : (utday, v, alpha, delta)
+        The dates, the apparent sidereal time at Greenwich at 0 UT, and
+        the geocentric sun right ascension and declination of shape
+        (3, len(dates)) at 0 TT on the previous, the same and the next
+        day.
+    """
+
+    dates = np.asarray(dates, dtype=np.float64)
     if ((dates % 86400) != 0.0).any():
         raise ValueError('Input dates must be at 00:00 UTC')
 
     utday = (dates // 86400) * 86400
     ttday0 = utday - delta_t
-    ttdayn1 = ttday0 - 86400
-    ttdayp1 = ttday0 + 86400
+    length = len(utday)
 
     # index 0 is v, 1 is alpha, 2 is delta
-    utday_res = solar_position(utday, 0, 0, 0, 0, 0, delta_t,
-                               0, numthreads, sst=True)
-    v = utday_res[0]
-
-    ttday0_res = solar_position(ttday0, 0, 0, 0, 0, 0, delta_t,
-                                0, numthreads, sst=True)
-    ttdayn1_res = solar_position(ttdayn1, 0, 0, 0, 0, 0, delta_t,
-                                 0, numthreads, sst=True)
-    ttdayp1_res = solar_position(ttdayp1, 0, 0, 0, 0, 0, delta_t,
-                                 0, numthreads, sst=True)
-    m0 = (ttday0_res[1] - lon - v) / 360
+    res = solar_position(
+        np.concatenate([utday, ttday0 - 86400, ttday0, ttday0 + 86400]),
+        0, 0, 0, 0, 0, delta_t, 0, numthreads, sst=True)
+    v = res[0][:length]
+    alpha = res[1][length:].reshape(3, length)
+    delta = res[2][length:].reshape(3, length)
+    return utday, v, alpha, delta
+
+
+def transit_sunrise_sunset_local(geo, lat, lon, delta_t):
+    """
+    Calculate the sun transit, sunrise and sunset from the output of
+    :func:`transit_sunrise_sunset_geocentric` for locations lat and lon,
+    which broadcast against the dates.
+    """
+
+    utday, v, alpha, delta = geo
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+
+    m0 = (alpha[1] - lon - v) / 360
     cos_arg = ((np.sin(np.radians(-0.8333)) - np.sin(np.radians(lat))
-               * np.sin(np.radians(ttday0_res[2]))) /
-               (np.cos(np.radians(lat)) * np.cos(np.radians(ttday0_res[2]))))
-    cos_arg[abs(cos_arg) > 1] = np.nan
+               * np.sin(np.radians(delta[1]))) /
+               (np.cos(np.radians(lat)) * np.cos(np.radians(delta[1]))))
+    cos_arg = np.where(abs(cos_arg) > 1, np.nan, cos_arg)
     H0 = np.degrees(np.arccos(cos_arg)) % 180
+    m0, H0 = np.broadcast_arrays(m0 % 1, H0)
 
-    m = np.empty((3, len(utday)))
-    m[0] = m0 % 1
-    m[1] = (m[0] - H0 / 360)
-    m[2] = (m[0] + H0 / 360)
+    m = np.array([m0, m0 - H0 / 360, m0 + H0 / 360])
 
     # need to account for fractions of day that may be the next or previous
     # day in UTC
     add_a_day = m[2] >= 1
     sub_a_day = m[1] < 0
-    m[1] = m[1] % 1
-    m[2] = m[2] % 1
+    m[1:] = m[1:] % 1
     vs = v + 360.985647 * m
     n = m + delta_t / 86400
 
-    a = ttday0_res[1] - ttdayn1_res[1]
-    a[abs(a) > 2] = a[abs(a) > 2] % 1
-    ap = ttday0_res[2] - ttdayn1_res[2]
-    ap[abs(ap) > 2] = ap[abs(ap) > 2] % 1
-    b = ttdayp1_res[1] - ttday0_res[1]
-    b[abs(b) > 2] = b[abs(b) > 2] % 1
-    bp = ttdayp1_res[2] - ttday0_res[2]
-    bp[abs(bp) > 2] = bp[abs(bp) > 2] % 1
+    def _wrap(diff):
+        return np.where(abs(diff) > 2, diff % 1, diff)
+
+    a = _wrap(alpha[1] - alpha[0])
+    ap = _wrap(delta[1] - delta[0])
+    b = _wrap(alpha[2] - alpha[1])
+    bp = _wrap(delta[2] - delta[1])
     c = b - a
     cp = bp - ap
 
-    alpha_prime = ttday0_res[1] + (n * (a + b + c * n)) / 2
-    delta_prime = ttday0_res[2] + (n * (ap + bp + cp * n)) / 2
+    alpha_prime = alpha[1] + (n * (a + b + c * n)) / 2
+    delta_prime = delta[1] + (n * (ap + bp + cp * n)) / 2
     Hp = (vs + lon - alpha_prime) % 360
-    Hp[Hp >= 180] = Hp[Hp >= 180] - 360
+    Hp = np.where(Hp >= 180, Hp - 360, Hp)
 
     h = np.degrees(np.arcsin(np.sin(np.radians(lat)) *
                              np.sin(np.radians(delta_prime)) +
@@ -1233,8 +2463,8 @@ def transit_sunrise_sunset(dates, lat, lon, delta_t, numthreads):
                                    np.cos(np.radians(lat)) *
                                    np.sin(np.radians(Hp[2])))) * 86400
 
-    S[add_a_day] += 86400
-    R[sub_a_day] -= 86400
+    S = np.where(add_a_day, S + 86400, S)
+    R = np.where(sub_a_day, R - 86400, R)
 
     transit = T + utday
     sunrise = R + utday
@@ -37,4 +37,4 @@ cdef extern from "spa.h":
 		double sunrise    
 		double sunset   
 
-	int spa_calculate(spa_data *spa)
+	int spa_calculate(spa_data *spa) nogil
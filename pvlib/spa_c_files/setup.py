@@ -5,5 +5,9 @@ from distutils.extension import Extension
 from Cython.Build import cythonize
 
 setup(
-    ext_modules = cythonize([Extension("spa_py", ["spa_py.pyx",'spa.c'])])
+    # OpenMP is used by spa_calc_array to split the loop across threads.
+    # Remove the extra args to build without it, the loop is then serial.
+    ext_modules = cythonize([Extension("spa_py", ["spa_py.pyx",'spa.c'],
+                                       extra_compile_args=['-fopenmp'],
+                                       extra_link_args=['-fopenmp'])])
 )
@@ -1,4 +1,9 @@
+cimport cython
 cimport cspa_py
+from cython.parallel cimport prange
+from libc.math cimport floor, NAN
+
+import numpy as np
 
 def spa_calc(year,month,day,hour,minute,second,timezone,latitude,longitude,elevation,pressure,temperature,delta_t):
 	cdef cspa_py.spa_data spa
@@ -24,6 +29,141 @@ def spa_calc(year,month,day,hour,minute,second,timezone,latitude,longitude,eleva
 	err=cspa_py.spa_calculate(&spa)
 
 	return spa
+
+
+# order of the rows of the output of _spa_calc_index
+SPA_ARRAY_OUTPUTS = ('e0', 'e', 'zenith', 'azimuth_astro', 'azimuth')
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef int _spa_calc_index(Py_ssize_t i, double[::1] unixtime,
+                         double[::1] latitude, double[::1] longitude,
+                         double[::1] elevation, double[::1] pressure,
+                         double[::1] temperature, double[::1] delta_t,
+                         double[::1] atmos_refract,
+                         double[:, ::1] out) except? -1 nogil:
+	cdef cspa_py.spa_data spa
+	cdef double t = unixtime[i]
+	cdef double days, secs
+	cdef long z, era, doe, yoe, doy, mp
+	cdef Py_ssize_t k
+	cdef int err
+
+	if t != t:
+		for k in range(out.shape[0]):
+			out[k, i] = NAN
+		return 0
+
+	# civil date from days since 1970-01-01 in the proleptic Gregorian
+	# calendar, see http://howardhinnant.github.io/date_algorithms.html
+	days = floor(t / 86400.)
+	secs = t - days * 86400.
+	z = <long>days + 719468
+	era = (z if z >= 0 else z - 146096) / 146097
+	doe = z - era * 146097
+	yoe = (doe - doe / 1460 + doe / 36524 - doe / 146096) / 365
+	doy = doe - (365 * yoe + yoe / 4 - yoe / 100)
+	mp = (5 * doy + 2) / 153
+
+	spa.day           = doy - (153 * mp + 2) / 5 + 1
+	spa.month         = mp + 3 if mp < 10 else mp - 9
+	spa.year          = yoe + era * 400 + (spa.month <= 2)
+	spa.hour          = <int>(secs / 3600.)
+	spa.minute        = <int>((secs - spa.hour * 3600.) / 60.)
+	spa.second        = secs - spa.hour * 3600. - spa.minute * 60.
+	spa.timezone      = 0
+	spa.delta_ut1     = 0
+	spa.delta_t       = delta_t[i]
+	spa.longitude     = longitude[i]
+	spa.latitude      = latitude[i]
+	spa.elevation     = elevation[i]
+	spa.pressure      = pressure[i]
+	spa.temperature   = temperature[i]
+	spa.slope         = 30
+	spa.azm_rotation  = -10
+	spa.atmos_refract = atmos_refract[i]
+	spa.function      = 0  # SPA_ZA, zenith and azimuth only
+
+	err = cspa_py.spa_calculate(&spa)
+
+	out[0, i] = spa.e0
+	out[1, i] = spa.e
+	out[2, i] = spa.zenith
+	out[3, i] = spa.azimuth_astro
+	out[4, i] = spa.azimuth
+	return err
+
+
+def _as_input_array(value, n):
+	arr = np.empty(n, dtype=np.float64)
+	arr[:] = value
+	return arr
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def spa_calc_array(unixtime, latitude, longitude, elevation, pressure,
+                   temperature, delta_t, atmos_refract=0.5667, numthreads=1):
+	"""
+	Calculate the solar position for an array of times.
+
+	The times are converted to calendar dates and passed to spa_calculate
+	in a C loop that runs without the GIL. The location and atmosphere
+	arguments may be scalars or arrays with the same length as unixtime.
+
+	Parameters
+	----------
+	unixtime : array-like of float
+	    Seconds since 1970-01-01 00:00:00 UTC. NaN gives NaN outputs.
+	latitude, longitude : float or array-like
+	    Degrees, east and north positive.
+	elevation : float or array-like
+	    Meters above sea level.
+	pressure : float or array-like
+	    Millibars.
+	temperature : float or array-like
+	    Degrees C.
+	delta_t : float or array-like
+	    Difference between terrestrial time and UT1 in seconds.
+	atmos_refract : float or array-like
+	    Atmospheric refraction at sunrise and sunset in degrees.
+	numthreads : int
+	    Number of OpenMP threads used for the loop. The loop is serial
+	    if the module was built without OpenMP.
+
+	Returns
+	-------
+	dict of numpy arrays
+	    Keys are the names of the spa_data fields e0, e, zenith,
+	    azimuth_astro and azimuth, and err for the spa_calculate
+	    return codes.
+	"""
+	cdef double[::1] ut = np.array(unixtime, dtype=np.float64).ravel()
+	cdef Py_ssize_t i, n = ut.shape[0]
+	cdef double[::1] lat = _as_input_array(latitude, n)
+	cdef double[::1] lon = _as_input_array(longitude, n)
+	cdef double[::1] elev = _as_input_array(elevation, n)
+	cdef double[::1] pres = _as_input_array(pressure, n)
+	cdef double[::1] temp = _as_input_array(temperature, n)
+	cdef double[::1] dt = _as_input_array(delta_t, n)
+	cdef double[::1] refr = _as_input_array(atmos_refract, n)
+	cdef int nthreads = max(int(numthreads), 1)
+
+	result = np.empty((len(SPA_ARRAY_OUTPUTS), n), dtype=np.float64)
+	errors = np.zeros(n, dtype=np.intc)
+	cdef double[:, ::1] out = result
+	cdef int[::1] err = errors
+
+	with nogil:
+		for i in prange(n, num_threads=nthreads, schedule='static'):
+			err[i] = _spa_calc_index(i, ut, lat, lon, elev, pres, temp,
+			                         dt, refr, out)
+
+	spa_out = dict(zip(SPA_ARRAY_OUTPUTS, result))
+	spa_out['err'] = errors
+	return spa_out
 	
 
 #spa.year          = 2004
@@ -71,6 +71,22 @@ def test_extraradiation_ephem_doyarray():
     irradiance.extraradiation(times.dayofyear, method='pyephem')
 
 
+def test_extraradiation_nrel_dtindex():
+    irradiance.extraradiation(times, method='nrel')
+
+
+def test_extraradiation_nrel_scalar():
+    assert_almost_equals(
+        1382, irradiance.extraradiation(300, method='nrel').values[0], -1)
+
+
+def test_extraradiation_nrel_doyarray():
+    result = irradiance.extraradiation(times.dayofyear, method='nrel')
+    assert_almost_equals(1382, irradiance.extraradiation(
+        np.array([300]), method='nrel').values[0], -1)
+    assert len(result) == len(times)
+
+
 def test_grounddiffuse_simple_float():
     irradiance.grounddiffuse(40, 900)
 
@@ -2,6 +2,10 @@ import logging
 pvl_logger = logging.getLogger('pvlib')
 
 import datetime
+import json
+import os
+import shutil
+import tempfile
 
 import numpy as np
 import numpy.testing as npt
@@ -13,6 +17,7 @@ from pandas.util.testing import assert_frame_equal
 
 from pvlib.location import Location
 from pvlib import solarposition
+from pvlib import _benchmark
 
 
 # setup times and locations to be tested.
@@ -65,6 +70,24 @@ def test_spa_localization():
         raise SkipTest
 
 
+def test_spa_c_numthreads():
+    try:
+        assert_frame_equal(solarposition.spa_c(times, tus),
+                           solarposition.spa_c(times, tus, numthreads=4))
+    except ImportError:
+        raise SkipTest
+
+
+def test_spa_c_raw_output():
+    try:
+        raw = solarposition.spa_c(times, tus, raw_spa_output=True)
+    except ImportError:
+        raise SkipTest
+    for name in ('e0', 'e', 'zenith', 'azimuth', 'sunrise', 'sunset',
+                 'suntransit', 'incidence'):
+        assert name in raw.columns
+
+
 def test_spa_python_numpy_physical():
     times = pd.date_range(datetime.datetime(2003,10,17,12,30,30), periods=1, freq='D')
     ephem_data = solarposition.spa_python(times, golden_mst, pressure=82000, 
@@ -94,7 +117,7 @@ def test_spa_python_numba_physical():
     except ImportError:
         raise SkipTest
     vers = numba.__version__.split('.')
-    if int(vers[0] + vers[1]) < 17:
+    if int(vers[0] + vers[1]) < 34:
         raise SkipTest
         
     times = pd.date_range(datetime.datetime(2003,10,17,12,30,30), periods=1, freq='D')
@@ -114,7 +137,7 @@ def test_spa_python_numba_physical_dst():
     except ImportError:
         raise SkipTest
     vers = numba.__version__.split('.')
-    if int(vers[0] + vers[1]) < 17:
+    if int(vers[0] + vers[1]) < 34:
         raise SkipTest
 
     times = pd.date_range(datetime.datetime(2003,10,17,13,30,30), periods=1, freq='D')
@@ -127,11 +150,437 @@ def test_spa_python_numba_physical_dst():
     assert_almost_equals(39.888378, ephem_data['apparent_elevation'], 6)
 
 
+def test_spa_python_import():
+    from pvlib import spa
+    numpy_spa = solarposition._spa_python_import('numpy')
+    assert not numpy_spa.USE_NUMBA
+    assert numpy_spa is solarposition._spa_python_import('numpy')
+    try:
+        import numba
+    except ImportError:
+        raise SkipTest
+    vers = numba.__version__.split('.')
+    if int(vers[0] + vers[1]) < 34:
+        raise SkipTest
+
+    numba_spa = solarposition._spa_python_import('numba')
+    assert numba_spa.USE_NUMBA
+    assert numba_spa is not numpy_spa
+    assert numba_spa is solarposition._spa_python_import('numba')
+    # pvlib.spa is not reloaded when switching between the two
+    import pvlib
+    assert pvlib.spa is spa
+    assert_frame_equal(solarposition.spa_python(times, tus, how='numpy'),
+                       solarposition.spa_python(times, tus, how='numba'))
+
+
+@raises(ValueError)
+def test_spa_python_import_invalid():
+    solarposition._spa_python_import('fortran')
+
+
+def test_get_solarposition_threads():
+    from multiprocessing.pool import ThreadPool
+    from pvlib.spa import PARALLEL_MIN_CHUNKSIZE
+    methods = ['nrel_numpy']
+    try:
+        import numba
+        vers = tuple(int(x) for x in numba.__version__.split('.')[:2])
+        if vers >= (0, 34):
+            methods.append('nrel_numba')
+    except ImportError:
+        pass
+    # slices long enough for nrel_numba to split them across 2 threads
+    nrows = 2 * PARALLEL_MIN_CHUNKSIZE
+    times = pd.date_range(start='2014-06-24', periods=nrows + 50, freq='T',
+                          tz=tus.tz)
+    expected = solarposition.spa_python(times, tus)
+    tasks = [(methods[i % len(methods)], i % 50, i % 50 + nrows)
+             for i in range(40)]
+
+    def calc(task):
+        method, start, stop = task
+        return solarposition.get_solarposition(
+            times[start:stop], tus, method=method, numthreads=2)
+
+    # load the backends in the main thread. numba's tbb threading layer
+    # can hang at exit if it is first started from another thread.
+    for method in methods:
+        solarposition._spa_python_import(method[5:])
+    pool = ThreadPool(8)
+    try:
+        results = pool.map(calc, tasks)
+    finally:
+        pool.close()
+        pool.join()
+    for (method, start, stop), result in zip(tasks, results):
+        assert_frame_equal(expected.iloc[start:stop], result)
+
+
 def test_spa_python_localization():    
     assert_frame_equal(solarposition.spa_python(times, tus), 
                        solarposition.spa_python(times_localized, tus))
 
 
+def test_spa_python_epoch_array():
+    expected = solarposition.spa_python(times_localized, tus)
+    unixtime = times_localized.astype(np.int64).values // 10**9
+    for time in (unixtime, unixtime.astype(float)):
+        result = solarposition.get_solarposition(time, tus)
+        assert isinstance(result, dict)
+        for column in expected.columns:
+            npt.assert_allclose(result[column], expected[column].values)
+
+
+def test_get_solarposition_datetime64_array():
+    # naive datetime64 arrays are localized like a DatetimeIndex
+    expected = solarposition.get_solarposition(times, tus)
+    for method in ('nrel_numpy', 'ephemeris'):
+        result = solarposition.get_solarposition(times.values, tus,
+                                                 method=method)
+        assert isinstance(result, pd.DataFrame)
+        npt.assert_allclose(result['apparent_zenith'].values,
+                            expected['apparent_zenith'].values, atol=0.1)
+    assert abs(expected['apparent_zenith'].iloc[0] - 124.04) < 0.01
+
+
+def test_spa_python_moving_observer():
+    lats = np.linspace(30, 35, len(times_localized))
+    track = Location(lats, tus.longitude, tus.tz, tus.altitude)
+    result = solarposition.spa_python(times_localized, track)
+    for i in (0, 100, len(times_localized) - 1):
+        site = Location(lats[i], tus.longitude, tus.tz, tus.altitude)
+        assert_frame_equal(
+            solarposition.spa_python(times_localized[i:i + 1], site),
+            result.iloc[i:i + 1])
+
+
+def test_spa_python_interpolate():
+    times = pd.date_range('2014-06-24', '2014-06-25', freq='10s',
+                          tz=tus.tz)
+    expected = solarposition.spa_python(times, tus)
+    result = solarposition.spa_python(times, tus, interpolate=300)
+    npt.assert_allclose(expected.values, result.values, atol=1e-6)
+
+
+def test_get_interval_solarposition():
+    hours = pd.date_range('2014-06-24 01:00', '2014-06-25 00:00', freq='1h',
+                          tz=tus.tz)
+    result = solarposition.get_interval_solarposition(hours, tus)
+    # average of the cosine of the zenith over each hour ending interval
+    dense = pd.date_range('2014-06-24 00:00:10', '2014-06-25 00:00',
+                          freq='20s', tz=tus.tz)
+    cos_zenith = np.cos(np.radians(
+        solarposition.spa_python(dense, tus)['zenith'])).clip(lower=0)
+    expected = cos_zenith.values.reshape(24, -1).mean(axis=1)
+    npt.assert_allclose(result['cos_zenith'].values, expected, atol=1e-3)
+    # sunrise, night and sunset
+    assert 0 < result['sun_fraction'].iloc[5] < 1
+    assert np.isnan(result['zenith'].iloc[0])
+    assert 0 < result['sun_fraction'].iloc[19] < 1
+    noon = solarposition.spa_python(hours[12:13] - pd.Timedelta('30min'),
+                                    tus)
+    assert abs(result['azimuth'].iloc[12] - noon['azimuth'].iloc[0]) < 1
+
+
+def test_get_elevation_crossings():
+    days = pd.date_range('2014-06-24', '2014-06-26', freq='D', tz=tus.tz)
+    result = solarposition.get_elevation_crossings(days, tus, [0, 10],
+                                                   xtol=0.1)
+    for column in result.columns:
+        times = pd.DatetimeIndex(result[column])
+        assert (times.date == days.date).all()
+        elevation = solarposition.spa_python(
+            times, tus)['apparent_elevation'].values
+        npt.assert_allclose(elevation, column[0], atol=1e-3)
+    # agrees with the SPA sunrise and sunset to their accuracy
+    result = solarposition.get_elevation_crossings(
+        days, tus, -0.8333, apparent=False)
+    expected = solarposition.get_sun_rise_set_transit(days, tus)
+    for event, column in (('rise', 'sunrise'), ('set', 'sunset')):
+        error = (result[(-0.8333, event)] - expected[column]).values
+        assert np.all(np.abs(error) < np.timedelta64(30, 's'))
+
+
+def test_get_elevation_crossings_multisite():
+    days = pd.date_range('2014-06-20', '2014-06-21', freq='D')
+    tromso = Location(69.6, 18.9, 'Europe/Oslo', 10)
+    tus_result, tromso_result = solarposition.get_elevation_crossings(
+        days, [tus, tromso], [0, 10, 90])
+    assert tus_result[(10, 'rise')].notnull().all()
+    # midnight sun and an elevation that is never reached
+    assert tromso_result[(0, 'rise')].isnull().all()
+    assert tromso_result[(10, 'set')].notnull().all()
+    assert tus_result[(90, 'set')].isnull().all()
+    for column in tromso_result.columns:
+        assert str(tromso_result[column].dt.tz) == tromso.tz
+    single = solarposition.get_elevation_crossings(days, tus, 10)
+    assert (single[(10, 'rise')] == tus_result[(10, 'rise')]).all()
+
+
+def test_iter_solarposition():
+    chunks = list(solarposition.iter_solarposition(
+        times[0], times[-1], '15Min', tus, chunk=50))
+    assert [len(chunk) for chunk in chunks] == [50, 50, 50, 43]
+    assert_frame_equal(solarposition.get_solarposition(times, tus),
+                       pd.concat(chunks))
+
+
+def test_get_solarposition_outputs():
+    outputs = ['apparent_zenith', 'azimuth']
+    expected = solarposition.spa_python(times_localized, tus)[outputs]
+    assert_frame_equal(expected, solarposition.get_solarposition(
+        times_localized, tus, outputs=outputs))
+    try:
+        import ephem
+    except ImportError:
+        raise SkipTest
+    result = solarposition.get_solarposition(times_localized, tus,
+                                             method='pyephem',
+                                             outputs=outputs)
+    assert list(result.columns) == outputs
+
+
+@raises(ValueError)
+def test_get_solarposition_no_outputs():
+    solarposition.get_solarposition(times_localized, tus, outputs=[])
+
+
+@raises(ValueError)
+def test_get_solarposition_epoch_array_method():
+    unixtime = times_localized.astype(np.int64).values // 10**9
+    solarposition.get_solarposition(unixtime, tus, method='pyephem')
+
+
+def test_spa_python_chebyshev_ephemeris():
+    from pvlib import spa
+    ephemeris = spa.chebyshev_ephemeris(2014, 2014, 67.0)
+    expected = solarposition.spa_python(times, golden)
+    result = solarposition.spa_python(times, golden,
+                                      chebyshev_ephemeris=ephemeris)
+    assert (expected.index == result.index).all()
+    assert (expected - result).abs().max().max() < 1e-6
+
+
+@raises(ValueError)
+def test_spa_python_chebyshev_ephemeris_delta_t():
+    from pvlib import spa
+    ephemeris = spa.chebyshev_ephemeris(2014, 2014, 67.0)
+    solarposition.spa_python(times, golden, delta_t=60.0,
+                             chebyshev_ephemeris=ephemeris)
+
+
+def test_spa_python_multisite():
+    locations = [tus, golden_mst, golden]
+    results = solarposition.spa_python_multisite(times, locations)
+    assert len(results) == len(locations)
+    for location, result in zip(locations, results):
+        assert_frame_equal(result, solarposition.spa_python(times, location))
+
+
+def test_get_solarposition_multisite():
+    locations = [tus, golden]
+    results = solarposition.get_solarposition(times_localized, locations)
+    for location, result in zip(locations, results):
+        assert_frame_equal(
+            result, solarposition.get_solarposition(times_localized, location))
+
+
+def test_get_solarposition_cache():
+    solarposition.enable_cache()
+    try:
+        expected = solarposition.get_solarposition(times_localized, tus)
+        result = solarposition.get_solarposition(times_localized, tus)
+        assert_frame_equal(expected, result)
+        info = solarposition.cache_info()
+        assert info['hits'] == 1
+        assert info['misses'] == 1
+        assert info['entries'] == 1
+        assert info['bytes'] > 0
+        # the cached result is not changed through the returned copy
+        result['zenith'] = 0
+        assert_frame_equal(
+            expected, solarposition.get_solarposition(times_localized, tus))
+        solarposition.get_solarposition(times_localized, tus,
+                                        temperature=20)
+        solarposition.get_solarposition(times_localized, golden)
+        info = solarposition.cache_info()
+        assert info['hits'] == 2
+        assert info['misses'] == 3
+
+        # least recently used results are dropped
+        solarposition.enable_cache(max_bytes=info['bytes'] // 3 * 2)
+        solarposition.get_solarposition(times_localized, tus)
+        solarposition.get_solarposition(times_localized, golden)
+        solarposition.get_solarposition(times_localized, tus)
+        info = solarposition.cache_info()
+        assert info['entries'] == 2
+        assert info['hits'] == 1
+        solarposition.get_solarposition(times_localized, golden_mst)
+        solarposition.get_solarposition(times_localized, golden)
+        info = solarposition.cache_info()
+        assert info['entries'] == 2
+        assert info['misses'] == 4
+        assert info['bytes'] <= info['max_bytes']
+    finally:
+        solarposition.disable_cache()
+    assert solarposition.cache_info() is None
+
+
+def test_get_solarposition_store():
+    expected = solarposition.get_solarposition(times_localized, tus)
+    tmpdir = tempfile.mkdtemp()
+    solarposition.enable_store(tmpdir, freq=900)
+    try:
+        result = solarposition.get_solarposition(times_localized, tus)
+        assert len(os.listdir(tmpdir)) == 2
+        npt.assert_allclose(expected.values, result.values, atol=1e-8)
+        result = solarposition.get_solarposition(times_localized, tus)
+        npt.assert_allclose(expected.values, result.values, atol=1e-8)
+        assert list(result.columns) == list(expected.columns)
+        assert result.index.equals(times_localized)
+        # uneven times are read from the same file
+        result = solarposition.get_solarposition(
+            times_localized[[0, 5, 6]], tus, outputs=['zenith'])
+        npt.assert_allclose(expected['zenith'].values[[0, 5, 6]],
+                            result['zenith'].values, atol=1e-8)
+        # times that are not on the grid of the store are calculated
+        solarposition.get_solarposition(times_localized + pd.Timedelta('1s'),
+                                        tus)
+        assert len(os.listdir(tmpdir)) == 2
+        solarposition.get_solarposition(times_localized, golden)
+        assert len(os.listdir(tmpdir)) == 4
+        # only the NREL methods are stored
+        solarposition.get_solarposition(times_localized, tus,
+                                        method='ephemeris')
+        assert len(os.listdir(tmpdir)) == 4
+        del result
+    finally:
+        solarposition.disable_store()
+        shutil.rmtree(tmpdir)
+
+
+def test_benchmark_methods():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'report.json')
+        result = _benchmark.benchmark_methods(
+            sizes=[10, 1], methods=['nrel_numpy', 'ephemeris'], repeat=1,
+            path=path)
+        with open(path) as f:
+            report = json.load(f)
+    finally:
+        shutil.rmtree(tmpdir)
+    assert list(result['method']) == ['nrel_numpy'] * 2 + ['ephemeris'] * 2
+    assert list(result['size']) == [1, 10, 1, 10]
+    assert (result['max_error'][result['method'] == 'nrel_numpy'] == 0).all()
+    assert (result['max_error'] < 1).all()
+    assert (result['throughput'] > 0).all()
+    assert len(report['results']) == 4
+    assert report['results'][3]['max_error'] == result['max_error'][3]
+
+
+def test_get_solarposition_auto():
+    method = solarposition.select_method(len(times_localized))
+    assert method in ('nrel_numpy', 'nrel_numba', 'nrel_c')
+    assert solarposition.select_method(10, numpy_times=True) != 'nrel_c'
+    result = solarposition.get_solarposition(times_localized, tus,
+                                             method='auto')
+    expected = solarposition.get_solarposition(times_localized, tus)
+    npt.assert_allclose(expected['apparent_zenith'].values,
+                        result['apparent_zenith'].values, atol=1e-3)
+
+
+def test_auto_method_status_numba_version():
+    try:
+        import numba
+    except ImportError:
+        raise SkipTest
+    version = numba.__version__
+    try:
+        for test_version, available in (('0.33.0', False), ('0.34.0', True),
+                                         ('0.57.1', True), ('1.0.0', True)):
+            numba.__version__ = test_version
+            status = solarposition._auto_method_status('nrel_numba')
+            assert status[0] == available
+    finally:
+        numba.__version__ = version
+
+
+def test_load_auto_calibration():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'calibration.json')
+        with open(path, 'w') as f:
+            json.dump({'nrel_numpy': {'warmup': 0, 'overhead': 0,
+                                      'per_time': 0},
+                       'nrel_numba': {'warmup': 1, 'overhead': 1,
+                                      'per_time': 1}}, f)
+        solarposition.load_auto_calibration(path)
+        assert solarposition.select_method(10**8) == 'nrel_numpy'
+    finally:
+        solarposition.load_auto_calibration()
+        shutil.rmtree(tmpdir)
+
+
+def test_select_method_kwargs():
+    auto_method_status = solarposition._auto_method_status
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'calibration.json')
+        with open(path, 'w') as f:
+            json.dump({'nrel_numpy': {'warmup': 0, 'overhead': 3,
+                                      'per_time': 0},
+                       'nrel_c': {'warmup': 0, 'overhead': 1,
+                                  'per_time': 0}}, f)
+        solarposition.load_auto_calibration(path)
+        solarposition._auto_method_status = lambda method: (
+            True, True, 'compiled')
+        assert solarposition.select_method(10) == 'nrel_c'
+        assert solarposition.select_method(
+            10, kwargs={'delta_t': None}) == 'nrel_c'
+        assert solarposition.select_method(
+            10, kwargs={'atmos_refract': 0.5667}) == 'nrel_numpy'
+        assert solarposition.select_method(10, nlocations=5) == 'nrel_numpy'
+        result = solarposition.get_solarposition(times_localized, tus,
+                                                 method='auto',
+                                                 atmos_refract=0.5667)
+        expected = solarposition.get_solarposition(times_localized, tus)
+        npt.assert_allclose(expected['apparent_zenith'].values,
+                            result['apparent_zenith'].values, atol=1e-3)
+    finally:
+        solarposition._auto_method_status = auto_method_status
+        solarposition.load_auto_calibration()
+        shutil.rmtree(tmpdir)
+
+
+def test_real_time_solar_position():
+    rs = np.random.RandomState(0)
+    unixtimes = np.sort(rs.uniform(1403568000, 1403568000 + 2 * 86400, 200))
+    expected = solarposition.spa_python(unixtimes, tus, delta_t=67.0)
+    for refresh in (1, 60, 3600):
+        calculator = solarposition.RealTimeSolarPosition(tus, refresh=refresh)
+        results = [calculator.get_position(t) for t in unixtimes]
+        for name in expected:
+            result = np.array([position[name] for position in results])
+            npt.assert_allclose(expected[name], result, rtol=0, atol=1e-4)
+    position = calculator.get_position()
+    assert 0 <= position['azimuth'] < 360
+    # times are accepted as timestamps, naive ones in the location tz
+    timestamp = pd.Timestamp(unixtimes[0], unit='s', tz='UTC')
+    expected = calculator.get_position(unixtimes[0])
+    for time in (timestamp, timestamp.tz_convert(tus.tz).tz_localize(None),
+                 timestamp.to_pydatetime()):
+        position = calculator.get_position(time)
+        for name in expected:
+            assert_almost_equals(expected[name], position[name], 6)
+
+
+@raises(TypeError)
+def test_real_time_solar_position_invalid_time():
+    solarposition.RealTimeSolarPosition(tus).get_position('noon')
+
+
 def test_get_sun_rise_set_transit():
     south = Location(-35.0, 0.0, tz='UTC')
     times = pd.DatetimeIndex([datetime.datetime(1996, 7, 5, 0),
@@ -168,6 +617,22 @@ def test_get_sun_rise_set_transit():
     assert_frame_equal(frame, result)
 
 
+def test_get_sun_rise_set_transit_multiple_locations():
+    times = pd.DatetimeIndex([datetime.datetime(2015, 1, 2),
+                              datetime.datetime(2015, 1, 2, 12),
+                              datetime.datetime(2015, 8, 2)]
+                             ).tz_localize('MST')
+    locations = [golden_mst, tus]
+    results = solarposition.get_sun_rise_set_transit(times, locations,
+                                                     delta_t=64.0)
+    assert len(results) == 2
+    for location, result in zip(locations, results):
+        assert_frame_equal(result, solarposition.get_sun_rise_set_transit(
+            times, location, delta_t=64.0))
+        # repeated dates give the same events
+        assert (result.iloc[0] == result.iloc[1]).all()
+
+
 def test_pyephem_physical():
     times = pd.date_range(datetime.datetime(2003,10,17,12,30,30), periods=1, freq='D')
     ephem_data = solarposition.pyephem(times, golden_mst, pressure=82000, temperature=11).ix[0]
@@ -192,6 +657,15 @@ def test_pyephem_localization():
     assert_frame_equal(solarposition.pyephem(times, tus), solarposition.pyephem(times_localized, tus))
 
 
+def test_pyephem_chunks():
+    expected = solarposition.pyephem(times, tus)
+    assert_frame_equal(expected,
+                       solarposition.pyephem(times, tus, chunksize=50))
+    assert_frame_equal(expected,
+                       solarposition.pyephem(times, tus, chunksize=50,
+                                             processes=2))
+
+
 def test_calc_time():
     import pytz
     import math
@@ -220,6 +694,17 @@ def test_earthsun_distance():
     assert_almost_equals(1, solarposition.pyephem_earthsun_distance(times).values[0], 0)
 
 
+def test_nrel_earthsun_distance():
+    times = pd.DatetimeIndex([datetime.datetime(2015, 1, 2),
+                              datetime.datetime(2015, 8, 2)]
+                             ).tz_localize('MST')
+    result = solarposition.nrel_earthsun_distance(times, delta_t=64.0)
+    expected = pd.Series(np.array([0.983289204601, 1.01486146446]),
+                         index=times)
+    npt.assert_almost_equal(expected.values, result.values, 6)
+    assert result.index.equals(times)
+
+
 def test_ephemeris_functional():
     solarposition.get_solarposition(
         time=times, location=golden_mst, method='ephemeris')
@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 import datetime as dt
 import logging
 pvl_logger = logging.getLogger('pvlib')
@@ -235,6 +237,182 @@ class SpaBase(object):
                 unixtimes, lat, lon, elev, pressure, temp, delta_t, 
                 atmos_refract, sst=True)[:3], 5)
 
+    def test_solar_position_outputs(self):
+        result = self.spa.solar_position(
+            unixtimes, lat, lon, elev, pressure, temp, delta_t,
+            atmos_refract, outputs=['azimuth', 'apparent_zenith'])
+        self.assertEqual(result.shape, (2, 1))
+        npt.assert_almost_equal(np.array([[Phi, theta]]).T, result, 5)
+        result = self.spa.solar_position(
+            unixtimes, lat, lon, elev, pressure, temp, delta_t,
+            atmos_refract, outputs=['elevation'])
+        npt.assert_almost_equal(np.array([[e0]]), result, 5)
+        self.assertRaises(ValueError, self.spa.solar_position, unixtimes,
+                          lat, lon, elev, pressure, temp, delta_t,
+                          atmos_refract, outputs=['sunrise'])
+
+    def test_solar_position_track(self):
+        times = np.array([unixtimes[0], unixtimes[0] + 3600])
+        lats = np.array([lat, -35.0])
+        lons = np.array([lon, 0.0])
+        elevs = np.array([elev, 0.0])
+        result = self.spa.solar_position(
+            times, lats, lons, elevs, pressure, temp, delta_t, atmos_refract,
+            numthreads=2)
+        npt.assert_almost_equal(
+            np.array([theta, theta0, e, e0, Phi]), result[:-1, 0], 5)
+        npt.assert_almost_equal(
+            self.spa.solar_position(times[1:], lats[1], lons[1], elevs[1],
+                                    pressure, temp, delta_t,
+                                    atmos_refract)[:, 0],
+            result[:, 1])
+
+    def test_solar_position_interpolated(self):
+        # two days of 7 second data, with sunrise and sunset
+        times = unixtimes[0] + np.arange(0, 2 * 86400, 7.)
+        exact = self.spa.solar_position(times, lat, lon, elev, pressure,
+                                        temp, delta_t, atmos_refract)
+        for spacing in (60, 300, 900):
+            result = self.spa.solar_position_interpolated(
+                times, lat, lon, elev, pressure, temp, delta_t,
+                atmos_refract, spacing)
+            self.assertLess(np.abs(exact - result).max(), 1e-6)
+        # sparse times are calculated exactly
+        npt.assert_almost_equal(
+            np.array([[theta, theta0, e, e0, Phi]]).T,
+            self.spa.solar_position_interpolated(
+                unixtimes, lat, lon, elev, pressure, temp, delta_t,
+                atmos_refract)[:-1], 5)
+
+    def test_solar_position_grid(self):
+        times = np.array([unixtimes[0], unixtimes[0] + 3600])
+        lats = np.array([lat, -35.0, 10.0])
+        lons = np.array([lon, 0.0])
+        result = self.spa.solar_position_grid(
+            times, lats, lons, elev, pressure, temp, delta_t, atmos_refract,
+            numthreads=2, max_bytes=1)
+        self.assertEqual(result.shape, (6, 2, 3, 2))
+        npt.assert_almost_equal(
+            np.array([theta, theta0, e, e0, Phi]), result[:-1, 0, 0, 0], 5)
+        npt.assert_almost_equal(
+            self.spa.solar_position(times, lats[1], lons[1], elev, pressure,
+                                    temp, delta_t, atmos_refract),
+            result[:, :, 1, 1])
+        zenith = self.spa.solar_position_grid(
+            times, *np.meshgrid(lats, lons, indexing='ij'), elevs=elev,
+            pressures=pressure, temps=temp, delta_t=delta_t,
+            atmos_refract=atmos_refract, outputs=['zenith'])
+        npt.assert_almost_equal(result[1:2], zenith)
+
+    def test_solar_position_multisite(self):
+        times = np.array([unixtimes[0], unixtimes[0] + 3600])
+        lats = np.array([lat, -35.0])
+        lons = np.array([lon, 0.0])
+        elevs = np.array([elev, 0.0])
+        result = self.spa.solar_position_multisite(
+            times, lats, lons, elevs, pressure, temp, delta_t, atmos_refract,
+            numthreads=2)
+        self.assertEqual(result.shape, (6, 2, 2))
+        npt.assert_almost_equal(
+            np.array([theta, theta0, e, e0, Phi]), result[:-1, 0, 0], 5)
+        for i in range(2):
+            npt.assert_almost_equal(
+                self.spa.solar_position(
+                    times, lats[i], lons[i], elevs[i], pressure, temp,
+                    delta_t, atmos_refract, numthreads=1),
+                result[:, i], 8)
+
+    def test_chebyshev_ephemeris(self):
+        ephemeris = self.spa.chebyshev_ephemeris(2003, 2003, delta_t)
+        self.assertEqual(ephemeris['coeffs'].shape,
+                         (5, 365, self.spa.CHEBYSHEV_DEGREE + 1))
+        times = np.linspace(1041379200, 1072915199, 1000)
+        npt.assert_allclose(
+            self.spa.solar_position(times, lat, lon, elev, pressure, temp,
+                                    delta_t, atmos_refract),
+            self.spa.solar_position_chebyshev(
+                times, ephemeris, lat, lon, elev, pressure, temp,
+                atmos_refract), rtol=0, atol=1e-6)
+        npt.assert_almost_equal(
+            np.array([theta, theta0, e, e0, Phi]),
+            self.spa.solar_position_chebyshev(
+                unixtimes, ephemeris, lat, lon, elev, pressure, temp,
+                atmos_refract)[:-1, 0], 5)
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'ephemeris.npz')
+            self.spa.save_chebyshev_ephemeris(path, ephemeris)
+            loaded = self.spa.load_chebyshev_ephemeris(path)
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertEqual(loaded['start'], ephemeris['start'])
+        self.assertEqual(loaded['delta_t'], ephemeris['delta_t'])
+        npt.assert_array_equal(loaded['coeffs'], ephemeris['coeffs'])
+
+        self.assertRaises(ValueError, self.spa.geocentric_position_chebyshev,
+                          np.array([1072915200.0]), ephemeris)
+
+    def test_solar_position_tolerance(self):
+        # random times in 1900-2100 and sites from pole to pole
+        rs = np.random.RandomState(0)
+        times = rs.uniform(-2208988800, 4133980799, 2000)
+        lats = rs.uniform(-89, 89, 2000)
+        lons = rs.uniform(-180, 180, 2000)
+        exact = self.spa.solar_position(times, lats, lons, elev, pressure,
+                                        temp, delta_t, atmos_refract)
+        exact_sst = self.spa.solar_position(times, lat, lon, elev, pressure,
+                                            temp, delta_t, atmos_refract,
+                                            sst=True)[:3]
+        nterms = None
+        for tolerance in (0.1, 0.01, 0.001):
+            series = self.spa.truncated_series(tolerance)
+            self.assertLessEqual(series['error_bound'], tolerance)
+            kept = sum(series[name][2].shape[0]
+                       for name in ('L', 'R', 'delta_psi', 'delta_epsilon'))
+            if nterms is not None:
+                self.assertGreater(kept, nterms)
+            nterms = kept
+            result = self.spa.solar_position(
+                times, lats, lons, elev, pressure, temp, delta_t,
+                atmos_refract, tolerance=tolerance)
+            self.assertLess(np.abs(exact[1] - result[1]).max(), tolerance)
+            self.assertLess(np.abs(exact[3] - result[3]).max(), tolerance)
+            azimuth = (exact[4] - result[4] + 180) % 360 - 180
+            self.assertLess(
+                np.abs(azimuth * np.sin(np.radians(exact[1]))).max(),
+                tolerance)
+            sst = self.spa.solar_position(
+                times, lat, lon, elev, pressure, temp, delta_t,
+                atmos_refract, sst=True, tolerance=tolerance)[:3]
+            sst[:2] = (sst[:2] - exact_sst[:2] + 180) % 360 - 180
+            sst[2] -= exact_sst[2]
+            self.assertLess(np.abs(sst).max(), tolerance)
+        # a large tolerance drops every periodic term but keeps the
+        # constant terms of the longitude and radius vector
+        series = self.spa.truncated_series(100)
+        self.assertEqual(series['delta_psi'][2].shape[0], 0)
+        self.assertEqual(series['delta_epsilon'][2].shape[0], 0)
+        self.assertGreater(series['R'][2].shape[0], 0)
+        result = self.spa.solar_position(
+            times, lats, lons, elev, pressure, temp, delta_t,
+            atmos_refract, tolerance=100)
+        self.assertTrue(np.isfinite(result).all())
+        # no terms are dropped without a tolerance, up to the rounding of
+        # the different summation order
+        npt.assert_almost_equal(
+            exact, self.spa.solar_position(
+                times, lats, lons, elev, pressure, temp, delta_t,
+                atmos_refract, tolerance=0), 8)
+
+    def test_parallel_chunksize(self):
+        self.assertEqual(self.spa.parallel_chunksize(100, 1), ('serial', 100))
+        self.assertEqual(self.spa.parallel_chunksize(100, 4, 60),
+                         ('serial', 100))
+        if self.spa.NUM_CORES >= 2:
+            self.assertEqual(self.spa.parallel_chunksize(101, 2, 10),
+                             ('parallel', 51))
+
     def test_equation_of_time(self):
         eot = 14.64
         M = self.spa.sun_mean_longitude(JME)
@@ -329,15 +507,45 @@ class NumpySpaTest(unittest.TestCase, SpaBase):
     def test_julian_day(self):
         assert_almost_equals(JD, self.spa.julian_day(unixtimes)[0], 6)
 
-
-@unittest.skipIf(numba_version_int < 17, 
-                 'Numba not installed or version not >= 0.17.0')
+    def test_heliocentric_batched(self):
+        assert_almost_equals(L, self.spa.heliocentric_longitude_batched(JME),
+                             6)
+        assert_almost_equals(B, self.spa.heliocentric_latitude_batched(JME),
+                             6)
+        assert_almost_equals(R, self.spa.heliocentric_radius_vector_batched(
+            JME), 6)
+        jme = np.linspace(-0.1, 0.1, 1001)
+        for name in ('heliocentric_longitude', 'heliocentric_latitude',
+                     'heliocentric_radius_vector'):
+            npt.assert_almost_equal(
+                getattr(self.spa, name)(jme),
+                getattr(self.spa, name + '_batched')(jme, chunksize=100), 10)
+
+    def test_nutation_batched(self):
+        assert_almost_equals(dPsi, self.spa.longitude_nutation_batched(
+            JCE, X0, X1, X2, X3, X4), 6)
+        assert_almost_equals(dEpsilon, self.spa.obliquity_nutation_batched(
+            JCE, X0, X1, X2, X3, X4), 6)
+        jce = np.linspace(-1, 1, 1001)
+        x = [self.spa.mean_elongation(jce), self.spa.mean_anomaly_sun(jce),
+             self.spa.mean_anomaly_moon(jce),
+             self.spa.moon_argument_latitude(jce),
+             self.spa.moon_ascending_longitude(jce)]
+        for name in ('longitude_nutation', 'obliquity_nutation'):
+            npt.assert_almost_equal(
+                getattr(self.spa, name)(jce, *x),
+                getattr(self.spa, name + '_batched')(jce, *x, chunksize=100),
+                10)
+
+
+@unittest.skipIf(numba_version_int < 34, 
+                 'Numba not installed or version not >= 0.34.0')
 class NumbaSpaTest(unittest.TestCase, SpaBase):
     """Import spa, compiling to numba, and run tests"""
     @classmethod
     def setUpClass(self):
         os.environ['PVLIB_USE_NUMBA'] = '1'
-        if numba_version_int >= 17:
+        if numba_version_int >= 34:
             import pvlib.spa as spa
             spa = reload(spa)
             self.spa = spa
@@ -359,6 +567,22 @@ class NumbaSpaTest(unittest.TestCase, SpaBase):
                 unixtimes, lat, lon, elev, pressure, temp, delta_t, 
                 atmos_refract, numthreads=1, sst=True)[:3], 5)
 
+    def test_solar_position_parallel(self):
+        times = unixtimes[0] + 60.0 * np.arange(
+            4 * self.spa.PARALLEL_MIN_CHUNKSIZE + 1)
+        expected = self.spa.solar_position(
+            times, lat, lon, elev, pressure, temp, delta_t, atmos_refract,
+            numthreads=1)
+        npt.assert_almost_equal(
+            expected, self.spa.solar_position(
+                times, lat, lon, elev, pressure, temp, delta_t,
+                atmos_refract, numthreads=4), 12)
+        loc_args = np.array([lat, lon, elev, pressure, temp, delta_t,
+                             atmos_refract, 0])
+        result = np.empty_like(expected)
+        self.spa.solar_position_loop_parallel(times, loc_args, result, 500)
+        npt.assert_almost_equal(expected, result, 12)
+
     def test_solar_position_multithreaded(self):
         result = np.array([theta, theta0, e, e0, Phi])
         nresult = np.array([result, result, result]).T
@@ -8,9 +8,12 @@ import sys
 try:
     from setuptools import setup, Command
     from setuptools.extension import Extension
+    from setuptools.command.build_ext import build_ext
 except ImportError:
     raise RuntimeError('setuptools is required')
 
+from distutils.errors import CCompilerError, DistutilsExecError
+
 DESCRIPTION = 'The PVLIB toolbox provides a set functions for simulating the performance of photovoltaic energy systems.'
 LONG_DESCRIPTION = open('README.md').read()
 
@@ -54,18 +57,37 @@ if all(map(os.path.exists, spa_all_file_paths)):
     print('all spa_c files found')
     PACKAGES.append('pvlib.spa_c_files')
 
-    spa_ext = Extension('pvlib.spa_c_files.spa_py', 
-                        sources=spa_sources, depends=spa_depends)
+    # OpenMP lets spa_calc_array split its loop across numthreads threads
+    spa_ext = Extension('pvlib.spa_c_files.spa_py',
+                        sources=spa_sources, depends=spa_depends,
+                        extra_compile_args=['-fopenmp'],
+                        extra_link_args=['-fopenmp'])
     extensions.append(spa_ext)
 else:
     print('WARNING: spa_c files not detected. ' +
           'See installation instructions for more information.')
 
+
+class openmp_build_ext(build_ext):
+    """Builds the extensions without OpenMP if the compiler rejects it."""
+    def build_extension(self, ext):
+        try:
+            build_ext.build_extension(self, ext)
+        except (CCompilerError, DistutilsExecError):
+            if '-fopenmp' not in ext.extra_compile_args:
+                raise
+            print('WARNING: %s could not be built with OpenMP, ' % ext.name +
+                  'building it without. numthreads will have no effect.')
+            ext.extra_compile_args.remove('-fopenmp')
+            ext.extra_link_args.remove('-fopenmp')
+            build_ext.build_extension(self, ext)
+
  
 setup(name=DISTNAME,
       version=__version__,
       packages=PACKAGES,
       ext_modules=extensions,
+      cmdclass={'build_ext': openmp_build_ext},
       description=DESCRIPTION,
       long_description=LONG_DESCRIPTION,
       author=AUTHOR,